@@ -2,10 +2,26 @@
 EZ-Steg: Easy-to-use Steganography Tool
 """
 
-from .ez_steg_core import StegoProduction
-from .ez_steg_lite import StegoLite
-from .ez_steg_emoji import StegoEmoji
-from .ez_steg_interactive import main
+import importlib
 
 __version__ = "0.1.0"
-__all__ = ['StegoProduction', 'StegoLite', 'StegoEmoji', 'main'] 
\ No newline at end of file
+__all__ = ['StegoProduction', 'StegoLite', 'StegoEmoji', 'main']
+
+# Exports resolve on first access, so running the CLI or importing one
+# engine does not load all of them
+_EXPORTS = {
+    'StegoProduction': '.ez_steg_core',
+    'StegoLite': '.ez_steg_lite',
+    'StegoEmoji': '.ez_steg_emoji',
+    'main': '.ez_steg_interactive',
+}
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
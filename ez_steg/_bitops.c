@@ -0,0 +1,189 @@
+/*
+ * C kernels for the LSB scatter/gather used by the steganography engines.
+ *
+ * embed_lsb(source, target, payload): write each payload byte MSB-first into
+ *     the LSBs of 8 consecutive values, taking the other bits from source.
+ * extract_lsb(source, out): fold the LSBs of each group of 8 source values
+ *     back into one byte of out.
+ *
+ * With SSSE3 two payload bytes (16 image values) are handled per iteration:
+ * PSHUFB broadcasts each byte across 8 lanes, a per-lane bit mask selects
+ * its bit, and the result is OR-ed into the cleared LSB plane. The scalar
+ * loop handles the tail and non-x86 builds.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#ifdef __SSSE3__
+#include <tmmintrin.h>
+#endif
+
+static void
+embed_scalar(const uint8_t *source, uint8_t *target, const uint8_t *payload,
+             Py_ssize_t start, Py_ssize_t nbytes)
+{
+    for (Py_ssize_t i = start; i < nbytes; i++) {
+        uint8_t b = payload[i];
+        const uint8_t *src = source + i * 8;
+        uint8_t *dst = target + i * 8;
+        for (int j = 0; j < 8; j++) {
+            dst[j] = (uint8_t)((src[j] & 0xFE) | ((b >> (7 - j)) & 1));
+        }
+    }
+}
+
+static void
+extract_scalar(const uint8_t *source, uint8_t *out, Py_ssize_t start,
+               Py_ssize_t nbytes)
+{
+    for (Py_ssize_t i = start; i < nbytes; i++) {
+        const uint8_t *src = source + i * 8;
+        uint8_t b = 0;
+        for (int j = 0; j < 8; j++) {
+            b = (uint8_t)((b << 1) | (src[j] & 1));
+        }
+        out[i] = b;
+    }
+}
+
+static void
+embed_kernel(const uint8_t *source, uint8_t *target, const uint8_t *payload,
+             Py_ssize_t nbytes)
+{
+    Py_ssize_t i = 0;
+#ifdef __SSSE3__
+    const __m128i broadcast = _mm_setr_epi8(0, 0, 0, 0, 0, 0, 0, 0,
+                                            1, 1, 1, 1, 1, 1, 1, 1);
+    const __m128i select = _mm_setr_epi8(
+        (char)0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01,
+        (char)0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01);
+    const __m128i one = _mm_set1_epi8(1);
+    const __m128i clear = _mm_set1_epi8((char)0xFE);
+
+    for (; i + 2 <= nbytes; i += 2) {
+        uint16_t pair;
+        memcpy(&pair, payload + i, sizeof(pair));
+        __m128i bytes = _mm_shuffle_epi8(_mm_cvtsi32_si128(pair), broadcast);
+        /* 0xFF where the selected bit is set, then reduce to 0/1 */
+        __m128i bits = _mm_and_si128(
+            _mm_cmpeq_epi8(_mm_and_si128(bytes, select), select), one);
+        __m128i values = _mm_loadu_si128((const __m128i *)(source + i * 8));
+        values = _mm_or_si128(_mm_and_si128(values, clear), bits);
+        _mm_storeu_si128((__m128i *)(target + i * 8), values);
+    }
+#endif
+    embed_scalar(source, target, payload, i, nbytes);
+}
+
+static void
+extract_kernel(const uint8_t *source, uint8_t *out, Py_ssize_t nbytes)
+{
+    Py_ssize_t i = 0;
+#ifdef __SSSE3__
+    /* Reverse each group of 8 so MOVMSKB yields the MSB-first byte */
+    const __m128i reverse = _mm_setr_epi8(7, 6, 5, 4, 3, 2, 1, 0,
+                                          15, 14, 13, 12, 11, 10, 9, 8);
+
+    for (; i + 2 <= nbytes; i += 2) {
+        __m128i values = _mm_loadu_si128((const __m128i *)(source + i * 8));
+        values = _mm_shuffle_epi8(values, reverse);
+        /* Move each LSB into its byte's top bit for MOVMSKB */
+        int mask = _mm_movemask_epi8(_mm_slli_epi16(values, 7));
+        out[i] = (uint8_t)(mask & 0xFF);
+        out[i + 1] = (uint8_t)(mask >> 8);
+    }
+#endif
+    extract_scalar(source, out, i, nbytes);
+}
+
+static PyObject *
+embed_lsb(PyObject *self, PyObject *args)
+{
+    Py_buffer source, target, payload;
+
+    if (!PyArg_ParseTuple(args, "y*w*y*", &source, &target, &payload)) {
+        return NULL;
+    }
+    if (source.len < payload.len * 8 || target.len < payload.len * 8) {
+        PyErr_SetString(PyExc_ValueError,
+                        "source and target need 8 values per payload byte");
+        PyBuffer_Release(&source);
+        PyBuffer_Release(&target);
+        PyBuffer_Release(&payload);
+        return NULL;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    embed_kernel((const uint8_t *)source.buf, (uint8_t *)target.buf,
+                 (const uint8_t *)payload.buf, payload.len);
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&source);
+    PyBuffer_Release(&target);
+    PyBuffer_Release(&payload);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+extract_lsb(PyObject *self, PyObject *args)
+{
+    Py_buffer source, out;
+
+    if (!PyArg_ParseTuple(args, "y*w*", &source, &out)) {
+        return NULL;
+    }
+    if (source.len < out.len * 8) {
+        PyErr_SetString(PyExc_ValueError,
+                        "source needs 8 values per output byte");
+        PyBuffer_Release(&source);
+        PyBuffer_Release(&out);
+        return NULL;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    extract_kernel((const uint8_t *)source.buf, (uint8_t *)out.buf, out.len);
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&source);
+    PyBuffer_Release(&out);
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef bitops_methods[] = {
+    {"embed_lsb", embed_lsb, METH_VARARGS,
+     "embed_lsb(source, target, payload)\n\n"
+     "Write payload bits MSB-first into the LSBs of 8 values per byte."},
+    {"extract_lsb", extract_lsb, METH_VARARGS,
+     "extract_lsb(source, out)\n\n"
+     "Gather the LSBs of 8 values per byte back into out."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef bitops_module = {
+    PyModuleDef_HEAD_INIT,
+    "_bitops",
+    "C kernels for LSB scatter/gather.",
+    -1,
+    bitops_methods
+};
+
+PyMODINIT_FUNC
+PyInit__bitops(void)
+{
+    PyObject *m = PyModule_Create(&bitops_module);
+    if (m == NULL)
+        return NULL;
+#ifdef __SSSE3__
+    /* Lets the caller check the running CPU before using these kernels */
+    if (PyModule_AddIntConstant(m, "SSSE3", 1) < 0) {
+#else
+    if (PyModule_AddIntConstant(m, "SSSE3", 0) < 0) {
+#endif
+        Py_DECREF(m);
+        return NULL;
+    }
+    return m;
+}
@@ -0,0 +1,25 @@
+"""
+Numba-compiled LSB kernels.
+Importing this module requires numba; callers fall back to NumPy without it.
+"""
+
+from numba import njit, prange
+
+@njit(parallel=True, cache=True)
+def embed_bits_nb(source, target, payload):
+    """Write payload bits MSB-first into the LSBs of 8 values per byte."""
+    for i in prange(payload.size):
+        b = payload[i]
+        base = i * 8
+        for j in range(8):
+            target[base + j] = (source[base + j] & 0xFE) | ((b >> (7 - j)) & 1)
+
+@njit(parallel=True, cache=True)
+def extract_bytes_nb(source, out):
+    """Gather the LSBs of 8 values per byte back into out."""
+    for i in prange(out.size):
+        base = i * 8
+        b = 0
+        for j in range(8):
+            b = (b << 1) | (source[base + j] & 1)
+        out[i] = b
@@ -0,0 +1,119 @@
+/*
+ * C codecs for the variation-selector encoding used by the emoji engine.
+ *
+ * encode_selectors(data): map each byte to its variation selector and
+ *     return the selectors as one str (0-15 -> U+FE00.., 16-255 -> U+E0100..).
+ * decode_selectors(text): map each variation selector in text back to its
+ *     byte, raising ValueError on any other code point.
+ *
+ * Encoding writes straight into the str buffer with a branchless code point
+ * expression, so no per-character Python objects are created.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+
+static PyObject *
+encode_selectors(PyObject *self, PyObject *args)
+{
+    Py_buffer data;
+
+    if (!PyArg_ParseTuple(args, "y*", &data))
+        return NULL;
+
+    const uint8_t *src = (const uint8_t *)data.buf;
+
+    /* A str must use the narrowest kind that fits, so payloads made only of
+     * bytes below 16 (BMP selectors) are built as UCS-2 */
+    int wide = 0;
+    for (Py_ssize_t i = 0; i < data.len; i++) {
+        if (src[i] >= 16) {
+            wide = 1;
+            break;
+        }
+    }
+
+    PyObject *result = PyUnicode_New(data.len, wide ? 0xE01EF : 0xFE0F);
+    if (result == NULL) {
+        PyBuffer_Release(&data);
+        return NULL;
+    }
+
+    if (wide) {
+        Py_UCS4 *out = PyUnicode_4BYTE_DATA(result);
+        for (Py_ssize_t i = 0; i < data.len; i++) {
+            Py_UCS4 b = src[i];
+            /* 0xE0100 - 0xFE00 - 16 = 0xD02F0 jumps to the supplementary range */
+            out[i] = 0xFE00 + b + (Py_UCS4)(b >= 16) * 0xD02F0;
+        }
+    }
+    else {
+        Py_UCS2 *out = PyUnicode_2BYTE_DATA(result);
+        for (Py_ssize_t i = 0; i < data.len; i++)
+            out[i] = (Py_UCS2)(0xFE00 + src[i]);
+    }
+
+    PyBuffer_Release(&data);
+    return result;
+}
+
+static PyObject *
+decode_selectors(PyObject *self, PyObject *args)
+{
+    PyObject *text;
+
+    if (!PyArg_ParseTuple(args, "U", &text))
+        return NULL;
+
+    Py_ssize_t n = PyUnicode_GET_LENGTH(text);
+    int kind = PyUnicode_KIND(text);
+    const void *data = PyUnicode_DATA(text);
+
+    PyObject *result = PyBytes_FromStringAndSize(NULL, n);
+    if (result == NULL)
+        return NULL;
+
+    uint8_t *out = (uint8_t *)PyBytes_AS_STRING(result);
+    for (Py_ssize_t i = 0; i < n; i++) {
+        Py_UCS4 cp = PyUnicode_READ(kind, data, i);
+        if (cp >= 0xFE00 && cp <= 0xFE0F) {
+            out[i] = (uint8_t)(cp - 0xFE00);
+        }
+        else if (cp >= 0xE0100 && cp <= 0xE01EF) {
+            out[i] = (uint8_t)(cp - 0xE0100 + 16);
+        }
+        else {
+            Py_DECREF(result);
+            PyErr_Format(PyExc_ValueError,
+                         "Invalid variation selector: U+%04X", (unsigned int)cp);
+            return NULL;
+        }
+    }
+
+    return result;
+}
+
+static PyMethodDef emoji_methods[] = {
+    {"encode_selectors", encode_selectors, METH_VARARGS,
+     "encode_selectors(data) -> str\n\n"
+     "Map each byte of data to its variation selector."},
+    {"decode_selectors", decode_selectors, METH_VARARGS,
+     "decode_selectors(text) -> bytes\n\n"
+     "Map each variation selector of text back to its byte."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef emoji_module = {
+    PyModuleDef_HEAD_INIT,
+    "_emoji",
+    "C codecs for variation-selector encoding.",
+    -1,
+    emoji_methods
+};
+
+PyMODINIT_FUNC
+PyInit__emoji(void)
+{
+    return PyModule_Create(&emoji_module);
+}
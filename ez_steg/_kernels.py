@@ -0,0 +1,74 @@
+"""
+LSB bit kernels shared by the production and Lite engines.
+
+Both engines store one payload byte MSB-first in the LSBs of eight channel
+values. The backend is chosen once at import: the optional C extension, then
+the numba kernels, then NumPy. This module imports neither the crypto
+libraries nor, when the C kernels load, numba.
+"""
+
+import numpy as np
+
+def _cpu_flags() -> frozenset:
+    """Read the CPU feature flags once; empty where /proc/cpuinfo is missing."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                # "flags" on x86, "Features" on ARM
+                name, _, value = line.partition(':')
+                if name.strip() in ('flags', 'Features'):
+                    return frozenset(value.split())
+    except OSError:
+        pass
+    return frozenset()
+
+CPU_FLAGS = _cpu_flags()
+
+try:
+    from ez_steg import _bitops
+    from ez_steg._bitops import embed_lsb, extract_lsb
+    # An SSSE3 build faults on CPUs without it; trust the build when the
+    # flags are unknown
+    if _bitops.SSSE3 and CPU_FLAGS and 'ssse3' not in CPU_FLAGS:
+        embed_lsb = extract_lsb = None
+except ImportError:  # C extension not built
+    embed_lsb = extract_lsb = None
+
+# numba takes a few hundred ms to import, so it is only loaded when the C
+# kernels are unavailable
+embed_bits_nb = extract_bytes_nb = None
+if embed_lsb is None:
+    try:
+        from ez_steg._bitops_numba import embed_bits_nb, extract_bytes_nb
+    except ImportError:  # numba is optional, the NumPy kernels are used without it
+        pass
+
+# Right-shifts that spread a byte MSB-first across eight LSB slots
+SHIFTS = np.array([7, 6, 5, 4, 3, 2, 1, 0], dtype=np.uint8)
+
+# Row b holds the bits of byte b MSB-first; 2 KiB, so it stays in L1
+SHIFT_TABLE = (np.arange(256, dtype=np.uint8)[:, None] >> SHIFTS) & 1
+
+def _scatter_bits(source: np.ndarray, target: np.ndarray, payload: np.ndarray) -> None:
+    """Write payload bits into target LSBs, taking the other bits from source."""
+    # One row of 8 channel values per payload byte
+    region = target.reshape(payload.size, 8)
+    
+    # Write the rows straight from the source with LSBs cleared, then OR in
+    # each byte's bits looked up from the table instead of shifted and masked
+    np.bitwise_and(source.reshape(payload.size, 8), 0xFE, out=region)
+    region |= SHIFT_TABLE[payload]
+
+def _gather_bits(source: np.ndarray, out: np.ndarray) -> None:
+    """Fold the LSBs of each row of 8 source values into a byte of out."""
+    # Mask and shift in one scratch buffer rather than a temporary per step
+    region = np.empty((out.size, 8), dtype=np.uint8)
+    np.bitwise_and(source.reshape(out.size, 8), 1, out=region)
+    np.left_shift(region, SHIFTS, out=region)
+    
+    # Sum each row of shifted bits into a byte
+    np.sum(region, axis=1, dtype=np.uint8, out=out)
+
+# Prefer the C LSB kernels, then the JIT-compiled ones, then NumPy
+embed_bits = embed_lsb or embed_bits_nb or _scatter_bits
+extract_bits = extract_lsb or extract_bytes_nb or _gather_bits
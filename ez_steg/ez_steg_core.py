@@ -5,21 +5,45 @@
 """
 
 import os
+import hashlib
 import logging
-import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from cryptography.exceptions import InvalidTag
 
+from ez_steg._kernels import CPU_FLAGS, embed_bits, extract_bits
+
+try:
+    from fastpbkdf2 import pbkdf2_hmac as fast_pbkdf2_hmac
+except ImportError:  # fastpbkdf2 is optional, hashlib is used without it
+    fast_pbkdf2_hmac = None
+
+try:
+    from argon2.low_level import Type as Argon2Type, hash_secret_raw
+except ImportError:  # argon2-cffi is optional, only needed for kdf="argon2id"
+    hash_secret_raw = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_HAS_SHANI = 'sha_ni' in CPU_FLAGS or 'sha2' in CPU_FLAGS
+
+# PBKDF2-HMAC-SHA256 implementation, chosen once at import. hashlib calls
+# straight into OpenSSL's PKCS5_PBKDF2_HMAC, which uses the SHA extensions
+# where the CPU has them; without them fastpbkdf2's tighter loop wins.
+if fast_pbkdf2_hmac is not None and not _HAS_SHANI:
+    _pbkdf2_hmac = fast_pbkdf2_hmac
+else:
+    _pbkdf2_hmac = hashlib.pbkdf2_hmac
+
 class SecurityError(Exception):
     """Raised for security-related errors."""
     pass
@@ -32,66 +56,270 @@ class StegoProduction:
     """Production steganography implementation with security features."""
     
     # Constants for the format
-    HEADER_SIZE = 9  # Format version (1 byte) + data length (4 bytes) + salt length (2 bytes) + nonce length (2 bytes)
-    FORMAT_VERSION = 1
+    HEADER_SIZE = 10  # Format version (1 byte) + KDF id (1 byte) + data length (4 bytes) + salt length (2 bytes) + nonce length (2 bytes)
+    LEGACY_HEADER_SIZE = 9  # Format version 1 had no KDF id byte (always PBKDF2)
+    FORMAT_VERSION = 2
     SALT_SIZE = 16
     NONCE_SIZE = 12
     KEY_SIZE = 32  # 256-bit key
     KDF_ITERATIONS = 600_000  # High iteration count for security
     
-    def __init__(self, password: str):
-        """Initialize with password."""
+    # Key derivation functions, stored by id in the header
+    KDF_PBKDF2 = 0
+    KDF_SCRYPT = 1
+    KDF_ARGON2ID = 2
+    KDF_NAMES = {'pbkdf2': KDF_PBKDF2, 'scrypt': KDF_SCRYPT, 'argon2id': KDF_ARGON2ID}
+    SCRYPT_N = 2 ** 17  # 128 MiB of memory with r=8
+    SCRYPT_R = 8
+    SCRYPT_P = 1
+    ARGON2_TIME_COST = 3
+    ARGON2_MEMORY_COST = 65536  # KiB (64 MiB)
+    ARGON2_PARALLELISM = 4
+    KEY_CACHE_SIZE = 8  # Recently derived keys kept per instance
+    CIPHER_CACHE_SIZE = 8  # AESGCM objects kept per instance, keyed by key
+    TAG_SIZE = 16  # AES-GCM authentication tag
+    STREAM_CHUNK_SIZE = 64 * 1024  # Plaintext bytes encrypted per LSB write or decrypted per yield
+    
+    def __init__(self, password: str, kdf: str = "pbkdf2", channels: str = "RGB"):
+        """
+        Initialize with password.
+        
+        Args:
+            password: Password used to derive the encryption key
+            kdf: Key derivation for new embeds: "pbkdf2" (default), "scrypt"
+                or "argon2id" (requires argon2-cffi). Extraction always uses
+                the function recorded in the image header.
+            channels: Color channels carrying data, e.g. "B" for blue only.
+                Images must be extracted with the same selection.
+        """
         if len(password) < 12:
             raise ValidationError("Password must be at least 12 characters")
+        if kdf not in self.KDF_NAMES:
+            raise ValidationError(f"Unsupported key derivation function: {kdf}")
+        if kdf == "argon2id" and hash_secret_raw is None:
+            raise ValidationError("argon2id key derivation requires the argon2-cffi package")
+        channels = channels.upper()
+        if not channels or not set(channels) <= set('RGB') or len(set(channels)) != len(channels):
+            raise ValidationError(f"Invalid channel selection: {channels}")
         self.password = password.encode('utf-8')
+        self.channels = [i for i, name in enumerate('RGB') if name in channels]
+        self.kdf = self.KDF_NAMES[kdf]
+        self._key_cache: OrderedDict = OrderedDict()
+        self._gcm_cache: OrderedDict = OrderedDict()
+        
+        # LSB kernels chosen at import: C, then numba, then NumPy
+        self._embed_impl = embed_bits
+        self._extract_impl = extract_bits
+    
+    def _derive_key(self, salt: bytes, kdf: int = KDF_PBKDF2) -> bytes:
+        """Derive encryption key, reusing a recent derivation for the same salt."""
+        cache_key = (kdf, salt)
+        key = self._key_cache.get(cache_key)
+        if key is not None:
+            self._key_cache.move_to_end(cache_key)
+            return key
+        
+        key = self._compute_key(salt, kdf)
+        self._key_cache[cache_key] = key
+        if len(self._key_cache) > self.KEY_CACHE_SIZE:
+            self._key_cache.popitem(last=False)
+        return key
+    
+    def _get_cipher(self, key: bytes) -> AESGCM:
+        """Return an AESGCM object for key, reusing a recent one."""
+        # AESGCM takes the nonce per call, so one object serves any number
+        # of messages under the same key
+        cipher = self._gcm_cache.get(key)
+        if cipher is not None:
+            self._gcm_cache.move_to_end(key)
+            return cipher
+        
+        cipher = AESGCM(key)
+        self._gcm_cache[key] = cipher
+        if len(self._gcm_cache) > self.CIPHER_CACHE_SIZE:
+            self._gcm_cache.popitem(last=False)
+        return cipher
     
-    def _derive_key(self, salt: bytes) -> bytes:
-        """Derive encryption key from password using PBKDF2."""
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=self.KEY_SIZE,
-            salt=salt,
-            iterations=self.KDF_ITERATIONS
+    def _compute_key(self, salt: bytes, kdf: int) -> bytes:
+        """Derive encryption key from password using the given KDF id."""
+        if kdf == self.KDF_ARGON2ID:
+            if hash_secret_raw is None:
+                raise ValidationError("argon2id key derivation requires the argon2-cffi package")
+            return hash_secret_raw(
+                self.password,
+                salt,
+                time_cost=self.ARGON2_TIME_COST,
+                memory_cost=self.ARGON2_MEMORY_COST,
+                parallelism=self.ARGON2_PARALLELISM,
+                hash_len=self.KEY_SIZE,
+                type=Argon2Type.ID
+            )
+        if kdf == self.KDF_SCRYPT:
+            return Scrypt(
+                salt=salt,
+                length=self.KEY_SIZE,
+                n=self.SCRYPT_N,
+                r=self.SCRYPT_R,
+                p=self.SCRYPT_P
+            ).derive(self.password)
+        return _pbkdf2_hmac(
+            'sha256', self.password, salt, self.KDF_ITERATIONS, self.KEY_SIZE
         )
-        return kdf.derive(self.password)
     
-    def _get_capacity(self, image: np.ndarray) -> int:
-        """Calculate available bytes for data storage."""
+    def _rgb_values(self, img: Image.Image) -> np.ndarray:
+        """Return the flat RGB channel values of an open image."""
+        if img.mode != 'RGB':
+            logger.info(f"Converting image from {img.mode} to RGB")
+            img = img.convert('RGB')
+        # The LSB routines only need the flat channel stream, so skip
+        # building a 3-D array and wrap the raw bytes directly
+        return np.frombuffer(img.tobytes(), dtype=np.uint8)
+    
+    def _load_rgb_flat(self, path: str) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Load an image as a flat RGB channel array plus its (width, height)."""
+        with Image.open(path) as img:
+            return self._rgb_values(img), img.size
+    
+    def _read_head(self, img: Image.Image, nbytes: int) -> bytes:
+        """Extract the first nbytes from only the first rows of an open image."""
+        width, height = img.size
+        # Interleaved RGB holds them in the first nbytes * 8 / 3 pixels; a
+        # channel plane needs nbytes * 8 pixels of its first channel
+        per_pixel = 3 if len(self.channels) == 3 else 1
+        pixels = -(-nbytes * 8 // per_pixel)
+        rows = min(height, -(-pixels // width))
+        
+        head = self._rgb_values(img.crop((0, 0, width, rows)))
+        if len(self.channels) != 3:
+            head = head[self.channels[0]::3]
+        return self._extract_bytes(head, nbytes)
+    
+    def _select_channels(self, image: np.ndarray) -> np.ndarray:
+        """Return the carrier values of the selected channels."""
+        if len(self.channels) == 3:
+            return image
+        # Split into one contiguous plane per selected channel, so the LSB
+        # kernels only walk the values they rewrite
+        return np.ascontiguousarray(image.reshape(-1, 3)[:, self.channels].T).ravel()
+    
+    def _merge_channels(self, image: np.ndarray, carrier: np.ndarray) -> np.ndarray:
+        """Write modified carrier planes back into the full channel array."""
+        if len(self.channels) == 3:
+            return carrier
+        merged = image.copy()
+        merged.reshape(-1, 3)[:, self.channels] = carrier.reshape(len(self.channels), -1).T
+        return merged
+    
+    def _get_capacity(self, num_values: int) -> int:
+        """Calculate available bytes for data storage in num_values channel values."""
         # We can use 1 bit per color channel (RGB)
         # Each byte needs 8 bits
         # Subtract header and minimum overhead
-        min_overhead = self.HEADER_SIZE + self.SALT_SIZE + self.NONCE_SIZE + 16  # 16 for auth tag
-        return (image.size // 24) - min_overhead
+        min_overhead = self.HEADER_SIZE + self.SALT_SIZE + self.NONCE_SIZE + self.TAG_SIZE
+        return (num_values // 24) - min_overhead
     
-    def _bits_from_bytes(self, data: bytes) -> np.ndarray:
-        """Convert bytes to bit array."""
-        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    def _embed_at(self, source: np.ndarray, target: np.ndarray, data: bytes, offset: int) -> int:
+        """
+        Embed bytes into target LSBs starting at byte offset.
+        
+        Args:
+            source: Flat carrier channel values
+            target: Flat output channel values
+            data: Bytes to embed
+            offset: Payload byte position to start at
+            
+        Returns:
+            int: Payload byte position after the written data
+        """
+        payload = np.frombuffer(data, dtype=np.uint8)
+        start = offset * 8
+        end = start + payload.size * 8
+        if end > source.size:
+            raise ValueError("Image too small for data")
+        self._embed_impl(source[start:end], target[start:end], payload)
+        return offset + payload.size
     
-    def _bytes_from_bits(self, bits: np.ndarray) -> bytes:
-        """Convert bit array back to bytes."""
-        padding = (8 - (len(bits) % 8)) % 8
-        if padding:
-            bits = np.pad(bits, (0, padding))
-        return np.packbits(bits).tobytes()
+    def _extract_bytes(self, image: np.ndarray, nbytes: int) -> bytes:
+        """Extract bytes from image LSBs, one byte per 8 channel values."""
+        if nbytes * 8 > image.size:
+            raise ValueError("Image too small for requested data")
+        out = np.empty(nbytes, dtype=np.uint8)
+        self._extract_impl(image.ravel()[:nbytes * 8], out)
+        return out.tobytes()
     
-    def _embed_bits(self, image: np.ndarray, bits: np.ndarray) -> np.ndarray:
-        """Embed bits into image LSBs."""
-        modified = image.copy()
-        flat_image = modified.ravel()
+    def _embed_chunks(self, image: np.ndarray, size: Tuple[int, int], pixels: np.ndarray,
+                      chunks: Iterable[bytes], output_path: str,
+                      progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Encrypt chunks straight into the LSB plane of image and save it.
         
-        # Clear LSBs of pixels we'll use
-        flat_image[:len(bits)] &= 0xFE
+        The header is written last, once the payload length is known, so
+        chunks may come from a stream of unknown length. progress, if
+        given, is called with the number of plaintext bytes embedded after
+        each STREAM_CHUNK_SIZE piece.
         
-        # Set LSBs according to our data
-        flat_image[:len(bits)] |= bits
+        Returns:
+            int: Number of plaintext bytes embedded
+        """
+        capacity = self._get_capacity(image.size)
         
-        return modified
-    
-    def _extract_bits(self, image: np.ndarray, num_bits: int) -> np.ndarray:
-        """Extract bits from image LSBs."""
-        return image.ravel()[:num_bits] & 1
+        # Generate salt and nonce
+        salt = os.urandom(self.SALT_SIZE)
+        nonce = os.urandom(self.NONCE_SIZE)
+        
+        # Derive key and create a streaming GCM encryptor
+        key = self._derive_key(salt, self.kdf)
+        encryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
+        
+        # Every value up to the end of the payload is written by the LSB
+        # kernels, so only the tail past it is copied, once its length
+        # is known
+        modified = np.empty_like(image)
+        source = image.ravel()
+        target = modified.ravel()
+        
+        # Encrypt chunk by chunk straight into the LSB plane so no full
+        # ciphertext buffer is built; the tag goes last, matching the
+        # AESGCM.encrypt layout
+        data_len = 0
+        pos = self.HEADER_SIZE + self.SALT_SIZE + self.NONCE_SIZE
+        for chunk in chunks:
+            data_len += len(chunk)
+            if data_len > capacity:
+                raise ValidationError(
+                    f"Data too large: exceeds capacity of {capacity} bytes"
+                )
+            # Release the view on the way out: a traceback keeps this frame
+            # alive, and a live export would stop a mapped chunk from
+            # being closed, hiding the real error behind a BufferError
+            with memoryview(chunk) as view:
+                for start in range(0, len(view), self.STREAM_CHUNK_SIZE):
+                    piece = encryptor.update(view[start:start + self.STREAM_CHUNK_SIZE])
+                    pos = self._embed_at(source, target, piece, pos)
+                    if progress is not None:
+                        progress(len(piece))
+        pos = self._embed_at(source, target, encryptor.finalize(), pos)
+        pos = self._embed_at(source, target, encryptor.tag, pos)
+        target[pos * 8:] = source[pos * 8:]
+        
+        # Prepare header with consistent size fields:
+        # version(1) + kdf(1) + data_len(4) + salt_len(2) + nonce_len(2), big-endian
+        header = (
+            bytes((self.FORMAT_VERSION, self.kdf)) +
+            data_len.to_bytes(4, 'big') +
+            len(salt).to_bytes(2, 'big') +
+            len(nonce).to_bytes(2, 'big')
+        )
+        self._embed_at(source, target, header + salt + nonce, 0)
+        
+        # Save result
+        width, height = size
+        modified = self._merge_channels(pixels, modified)
+        Image.fromarray(modified.reshape(height, width, 3)).save(output_path, 'PNG')
+        return data_len
     
-    def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
+    def embed(self, data: bytes, input_path: str, output_path: str,
+              progress: Optional[Callable[[int], None]] = None) -> bool:
         """
         Embed encrypted data into an image.
         
@@ -99,6 +327,8 @@ def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
             data: Raw data to embed
             input_path: Path to carrier image
             output_path: Path for output image
+            progress: Optional callback, given the byte count of each
+                embedded piece
             
         Returns:
             bool: True if successful
@@ -109,48 +339,54 @@ def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
         """
         try:
             # Load and validate image
-            with Image.open(input_path) as img:
-                if img.mode != 'RGB':
-                    logger.info(f"Converting image from {img.mode} to RGB")
-                    img = img.convert('RGB')
-                image = np.array(img)
+            pixels, size = self._load_rgb_flat(input_path)
+            image = self._select_channels(pixels)
             
             # Check capacity
-            if len(data) > self._get_capacity(image):
+            if len(data) > self._get_capacity(image.size):
                 raise ValidationError(
                     f"Data too large: {len(data)} bytes exceeds capacity"
                 )
             
-            # Generate salt and nonce
-            salt = os.urandom(self.SALT_SIZE)
-            nonce = os.urandom(self.NONCE_SIZE)
-            
-            # Derive key and create cipher
-            key = self._derive_key(salt)
-            cipher = AESGCM(key)
-            
-            # Encrypt data
-            ciphertext = cipher.encrypt(nonce, data, None)
+            self._embed_chunks(image, size, pixels, (data,), output_path, progress)
+            logger.info(f"Successfully embedded {len(data)} bytes of data")
+            return True
             
-            # Prepare header with consistent size fields
-            header = struct.pack(
-                '>BIHH',  # Format: version(B) + data_len(I) + salt_len(H) + nonce_len(H)
-                self.FORMAT_VERSION,
-                len(data),
-                len(salt),
-                len(nonce)
-            )
+        except (ValidationError, SecurityError):
+            raise
+        except Exception as e:
+            logger.error(f"Embedding failed: {str(e)}")
+            raise SecurityError(f"Embedding failed: {str(e)}")
+    
+    def embed_stream(self, chunks: Iterable[bytes], input_path: str, output_path: str,
+                     progress: Optional[Callable[[int], None]] = None) -> bool:
+        """
+        Embed encrypted data read from an iterable of byte chunks.
+        
+        Chunks are encrypted into the image as they arrive, so only one
+        chunk of plaintext is held at a time.
+        
+        Args:
+            chunks: Iterable of bytes-like chunks, e.g. from a file object
+            input_path: Path to carrier image
+            output_path: Path for output image
+            progress: Optional callback, given the byte count of each
+                embedded piece
             
-            # Combine all components
-            all_data = header + salt + nonce + ciphertext
+        Returns:
+            bool: True if successful
             
-            # Convert to bits and embed
-            bits = self._bits_from_bytes(all_data)
-            modified = self._embed_bits(image, bits)
+        Raises:
+            ValidationError: If data too large or invalid input
+            SecurityError: If encryption fails
+        """
+        try:
+            # Load and validate image
+            pixels, size = self._load_rgb_flat(input_path)
+            image = self._select_channels(pixels)
             
-            # Save result
-            Image.fromarray(modified).save(output_path, 'PNG')
-            logger.info(f"Successfully embedded {len(data)} bytes of data")
+            data_len = self._embed_chunks(image, size, pixels, chunks, output_path, progress)
+            logger.info(f"Successfully embedded {data_len} bytes of data")
             return True
             
         except (ValidationError, SecurityError):
@@ -159,6 +395,67 @@ def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
             logger.error(f"Embedding failed: {str(e)}")
             raise SecurityError(f"Embedding failed: {str(e)}")
     
+    def _open_payload(self, input_path: str) -> Tuple[np.ndarray, int, int, bytes, bytes]:
+        """
+        Validate the header of an image and derive its key.
+        
+        Returns:
+            Tuple of (carrier channel values, ciphertext byte offset,
+            data length, nonce, key)
+        """
+        # Only the header rows are converted until the header checks out,
+        # so invalid carriers skip the full-image conversion and copy
+        with Image.open(input_path) as img:
+            width, height = img.size
+            
+            # Extract and parse header
+            header = self._read_head(img, self.HEADER_SIZE)
+            
+            # Validate format version; version 1 headers are one byte
+            # shorter and implicitly use PBKDF2
+            version = header[0]
+            if version == self.FORMAT_VERSION:
+                header_size = self.HEADER_SIZE
+                kdf = header[1]
+                offset = 2
+            elif version == 1:
+                header_size = self.LEGACY_HEADER_SIZE
+                kdf = self.KDF_PBKDF2
+                offset = 1
+            else:
+                raise ValidationError(f"Unsupported format version: {version}")
+            
+            # The fixed-width fields are read directly, big-endian
+            data_len = int.from_bytes(header[offset:offset + 4], 'big')
+            salt_len = int.from_bytes(header[offset + 4:offset + 6], 'big')
+            nonce_len = int.from_bytes(header[offset + 6:offset + 8], 'big')
+            
+            if kdf not in self.KDF_NAMES.values():
+                raise ValidationError(f"Unsupported key derivation function: {kdf}")
+            
+            # Validate lengths; the capacity follows from the image size
+            capacity = self._get_capacity(width * height * len(self.channels))
+            if not (0 < salt_len <= 64 and 0 < nonce_len <= 32 and 0 < data_len <= capacity):
+                raise ValidationError("Invalid data lengths in header")
+            
+            # The salt sits right after the header, so the key can be
+            # derived on a worker thread (the KDFs release the GIL) while
+            # this one converts the image
+            salt = self._read_head(img, header_size + salt_len)[header_size:]
+            pool = ThreadPoolExecutor(max_workers=1)
+            try:
+                key_future = pool.submit(self._derive_key, salt, kdf)
+                image = self._select_channels(self._rgb_values(img))
+                
+                pos = header_size + salt_len
+                nonce = self._extract_bytes(image, pos + nonce_len)[pos:]
+                key = key_future.result()
+            finally:
+                # Don't hold an error up behind a running derivation
+                pool.shutdown(wait=False)
+        
+        return image, pos + nonce_len, data_len, nonce, key
+    
     def extract(self, input_path: str) -> bytes:
         """
         Extract and decrypt data from an image.
@@ -174,54 +471,13 @@ def extract(self, input_path: str) -> bytes:
             SecurityError: If decryption fails
         """
         try:
-            # Load image
-            with Image.open(input_path) as img:
-                if img.mode != 'RGB':
-                    logger.info(f"Converting image from {img.mode} to RGB")
-                    img = img.convert('RGB')
-                image = np.array(img)
+            image, pos, data_len, nonce, key = self._open_payload(input_path)
             
-            # Extract and parse header
-            header_bits = self._extract_bits(image, self.HEADER_SIZE * 8)
-            header = self._bytes_from_bits(header_bits)
-            
-            try:
-                version, data_len, salt_len, nonce_len = struct.unpack('>BIHH', header)
-            except struct.error:
-                raise SecurityError("Invalid header format")
+            # Extract the ciphertext and tag
+            ciphertext = self._extract_bytes(image, pos + data_len + self.TAG_SIZE)[pos:]
             
-            # Validate format version
-            if version != self.FORMAT_VERSION:
-                raise ValidationError(f"Unsupported format version: {version}")
-            
-            # Validate lengths
-            if not (0 < salt_len <= 64 and 0 < nonce_len <= 32 and 0 < data_len <= self._get_capacity(image)):
-                raise ValidationError("Invalid data lengths in header")
-            
-            # Calculate total size needed
-            total_size = (
-                self.HEADER_SIZE +
-                salt_len +
-                nonce_len +
-                data_len +
-                16  # Auth tag
-            )
-            
-            # Extract all data bits
-            all_bits = self._extract_bits(image, total_size * 8)
-            all_data = self._bytes_from_bits(all_bits)
-            
-            # Split components
-            pos = self.HEADER_SIZE
-            salt = all_data[pos:pos + salt_len]
-            pos += salt_len
-            nonce = all_data[pos:pos + nonce_len]
-            pos += nonce_len
-            ciphertext = all_data[pos:]
-            
-            # Derive key and create cipher
-            key = self._derive_key(salt)
-            cipher = AESGCM(key)
+            # Create cipher for the derived key
+            cipher = self._get_cipher(key)
             
             # Decrypt data
             try:
@@ -239,14 +495,63 @@ def extract(self, input_path: str) -> bytes:
             logger.error(f"Extraction failed: {str(e)}")
             raise SecurityError(f"Extraction failed: {str(e)}")
     
+    def extract_iter(self, input_path: str,
+                     on_length: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+        """
+        Extract and decrypt data from an image, yielding it in chunks.
+        
+        Only one chunk of plaintext is held at a time. The authentication
+        tag is checked after the last chunk, so chunks are unverified until
+        the iterator finishes without raising; output written from them
+        must be discarded on error.
+        
+        Args:
+            input_path: Path to image containing hidden data
+            on_length: Optional callback, given the payload length in bytes
+                once it is read and before the first chunk is yielded
+            
+        Yields:
+            bytes: Chunks of decrypted data, up to STREAM_CHUNK_SIZE each
+            
+        Raises:
+            ValidationError: If invalid input
+            SecurityError: If decryption fails
+        """
+        try:
+            image, pos, data_len, nonce, key = self._open_payload(input_path)
+            if on_length is not None:
+                on_length(data_len)
+            
+            # The tag follows the ciphertext
+            end = pos + data_len
+            tag = self._extract_bytes(image[end * 8:], self.TAG_SIZE)
+            decryptor = Cipher(algorithms.AES(key), modes.GCM(nonce, tag)).decryptor()
+            
+            # Gather and decrypt one chunk of the LSB plane at a time
+            while pos < end:
+                size = min(self.STREAM_CHUNK_SIZE, end - pos)
+                yield decryptor.update(self._extract_bytes(image[pos * 8:], size))
+                pos += size
+            
+            try:
+                decryptor.finalize()
+            except InvalidTag:
+                raise SecurityError("Decryption failed: Invalid password or corrupted data")
+            logger.info(f"Successfully extracted {data_len} bytes of data")
+            
+        except (ValidationError, SecurityError):
+            raise
+        except Exception as e:
+            logger.error(f"Extraction failed: {str(e)}")
+            raise SecurityError(f"Extraction failed: {str(e)}")
+    
     def get_capacity(self, image_path: str) -> Tuple[int, str]:
         """Get capacity of image in bytes."""
+        # The size is in the PNG header, so no pixel data is decoded
         with Image.open(image_path) as img:
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            image = np.array(img)
+            width, height = img.size
         
-        capacity = self._get_capacity(image)
+        capacity = self._get_capacity(width * height * len(self.channels))
         
         # Make human readable
         suffixes = ['B', 'KB', 'MB', 'GB']
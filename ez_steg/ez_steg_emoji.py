@@ -7,11 +7,49 @@
 import logging
 from typing import Tuple, Optional
 import struct
+import numpy as np
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Variation selector for every byte value:
+# 0-15 -> U+FE00..U+FE0F, 16-255 -> U+E0100..U+E01EF
+_VS_TABLE = tuple(
+    chr(0xFE00 + b) if b < 16 else chr(0xE0100 + (b - 16))
+    for b in range(256)
+)
+
+# Byte value for every code point up to the last variation selector;
+# anything that is not a selector decodes to _INVALID
+_INVALID = 256
+_DECODE = np.full(0xE01F0, _INVALID, dtype=np.uint16)
+_DECODE[0xFE00:0xFE10] = np.arange(16)
+_DECODE[0xE0100:0xE01F0] = np.arange(16, 256)
+
+def _encode_selectors(data: bytes) -> str:
+    """Map each byte to its variation selector in one vectorized pass."""
+    payload = np.frombuffer(data, dtype=np.uint8).astype('<u4')
+    # Branchless: bytes from 16 up jump by 0xE0100 - 0xFE00 - 16 into the
+    # supplementary range
+    code_points = 0xFE00 + payload + (payload >= 16) * np.uint32(0xD02F0)
+    return code_points.astype('<u4', copy=False).tobytes().decode('utf-32-le')
+
+def _decode_selectors(selectors: str) -> bytes:
+    """Map each variation selector back to its byte in one table gather."""
+    code_points = np.frombuffer(selectors.encode('utf-32-le'), dtype='<u4')
+    values = _DECODE[np.minimum(code_points, _DECODE.size - 1)]
+    invalid = (values == _INVALID) | (code_points >= _DECODE.size)
+    if invalid.any():
+        code_point = int(code_points[invalid.argmax()])
+        raise ValueError(f"Invalid variation selector: U+{code_point:04X}")
+    return values.astype(np.uint8).tobytes()
+
+try:
+    from ez_steg._emoji import encode_selectors, decode_selectors
+except ImportError:  # C extension not built, the table codecs are used
+    encode_selectors, decode_selectors = _encode_selectors, _decode_selectors
+
 class StegoEmoji:
     """Emoji-based steganography implementation."""
     
@@ -33,13 +71,7 @@ def _byte_to_variation_selector(self, byte: int) -> str:
         """
         if not 0 <= byte <= 255:
             raise ValueError("Byte value must be between 0 and 255")
-            
-        if byte < 16:
-            # Use first range (FE00-FE0F)
-            return chr(0xFE00 + byte)
-        else:
-            # Use second range (E0100-E01EF)
-            return chr(0xE0100 + (byte - 16))
+        return _VS_TABLE[byte]
     
     def _variation_selector_to_byte(self, selector: str) -> int:
         """Convert a variation selector character back to a byte."""
@@ -68,16 +100,13 @@ def embed(self, data: bytes) -> str:
             str: String with hidden data
         """
         try:
-            # Add length prefix (4 bytes)
+            # Add length prefix (4 bytes); it is encoded on its own so a
+            # mapped payload is read in place rather than copied into bytes
             length_prefix = struct.pack('>I', len(data))
-            all_data = length_prefix + data
             
-            # Convert each byte to a variation selector
-            result = [self.base_emoji]  # Start with base character
-            for byte in all_data:
-                result.append(self._byte_to_variation_selector(byte))
-            
-            encoded = ''.join(result)
+            # Convert each byte to a variation selector after the base character
+            encoded = ''.join((self.base_emoji, encode_selectors(length_prefix),
+                               encode_selectors(data)))
             logger.info(f"Successfully embedded {len(data)} bytes into {len(encoded)} characters")
             return encoded
             
@@ -102,13 +131,8 @@ def extract(self, text: str) -> bytes:
             # Skip the first character (base emoji)
             selectors = text[1:]
             
-            # Convert variation selectors back to bytes
-            bytes_list = []
-            for selector in selectors:
-                bytes_list.append(self._variation_selector_to_byte(selector))
-            
-            # Convert to bytes
-            all_data = bytes(bytes_list)
+            # Convert the variation selectors back to bytes
+            all_data = decode_selectors(selectors)
             
             # Extract length prefix
             if len(all_data) < 4:
@@ -8,32 +8,253 @@
 import sys
 import time
 import getpass
+import gzip
+import io
+import stat
+import mmap
 import tempfile
 import tarfile
+import contextlib
 import fnmatch
+import functools
+import itertools
+import operator
+import re
+import shutil
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Union, Dict, Any, List, Set, Tuple
+from typing import Optional, Union, Dict, Any, List, Set, Tuple, BinaryIO
 import logging
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, DownloadColumn
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 from rich import print as rprint
-from PIL import Image
 import math
-import numpy as np
 
-from ez_steg.ez_steg_core import StegoProduction, SecurityError, ValidationError
-from ez_steg.ez_steg_lite import StegoLite
-from ez_steg.ez_steg_emoji import StegoEmoji
+try:
+    import grp
+    import pwd
+except ImportError:  # Windows; owner names are left empty, as tarfile does
+    grp = pwd = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, folders are gzipped without it
+    zstandard = None
+
+# The stego engines, PIL and NumPy are imported where they are used: they
+# pull in numba and cryptography, which dominate start-up while the menu
+# only needs rich
 
 # Set up rich console
 console = Console()
 
+@functools.lru_cache(maxsize=8)
+def _compile_excludes(patterns: frozenset) -> Tuple[Optional[re.Pattern], Optional[re.Pattern]]:
+    """
+    Compile exclusion globs into (name regex, full-path regex).
+    
+    Patterns are partitioned up front: basename globs (no "/") go into the
+    name regex, since a pattern with a "/" can never match a bare name.
+    Only patterns that can match a full path other than the bare name
+    (those with a "/" or a wildcard) go into the path regex. Patterns are
+    case-normalized like fnmatch does.
+    """
+    def join(globs):
+        if not globs:
+            return None
+        return re.compile('|'.join(f'(?:{fnmatch.translate(os.path.normcase(g))})' for g in sorted(globs)))
+    
+    name_globs = [g for g in patterns if '/' not in g]
+    path_globs = [g for g in patterns if any(c in g for c in '/*?[')]
+    return join(name_globs), join(path_globs)
+
+def _compile_dir_excludes(patterns: Set[str]) -> Optional[re.Pattern]:
+    """
+    Compile the directory names to prune: "name/*" globs and literal bare
+    names such as "build".
+    
+    Bare wildcard globs like "*.log" are file patterns; a "build.log"
+    directory still has its contents archived, so it is not pruned.
+    """
+    names = frozenset(
+        pattern[:-2] if pattern.endswith('/*') else pattern
+        for pattern in patterns
+        if pattern.endswith('/*') or not any(c in pattern for c in '/*?[')
+    )
+    return _compile_excludes(names)[0]
+
+_SIZE_UNITS = ('bytes', 'KB', 'MB', 'GB', 'TB')
+
+def _format_size(size: int) -> str:
+    """Format size in a human-readable format."""
+    # Each unit is 2**10 of the previous, so the unit index comes straight
+    # from the bit length instead of a comparison chain
+    unit = min(len(_SIZE_UNITS) - 1, max(0, (int(size).bit_length() - 1) // 10))
+    if unit == 0:
+        return f"{size} bytes"
+    return f"{size / (1 << (10 * unit)):.2f} {_SIZE_UNITS[unit]}"
+
+def _unmatched(names: List[str], regex: Optional[re.Pattern], items: Optional[list] = None) -> list:
+    """
+    Return the items (default: the names themselves) whose name regex does
+    not match, filtered in one C-level pass.
+    """
+    if items is None:
+        items = names
+    if regex is None:
+        return list(items)
+    hits = map(regex.match, map(os.path.normcase, names))
+    return list(itertools.compress(items, map(operator.not_, hits)))
+
+def _write_all(f: io.RawIOBase, data) -> None:
+    """Write all of data to an unbuffered file, retrying short writes."""
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
+@contextlib.contextmanager
+def _replace_on_success(path: Path):
+    """
+    Open an unbuffered temporary file next to path, moved onto path only
+    if the block completes.
+    
+    A failed extraction thus leaves an existing file at path untouched.
+    """
+    temp = path.with_name(f".{path.name}.{os.urandom(4).hex()}.part")
+    # A fresh O_EXCL file is created with the usual umask-derived mode
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with open(fd, 'wb', buffering=0) as f:
+            yield f
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+def _read_file(path: str) -> Optional[bytes]:
+    """Read a whole file; None if it cannot be read."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+@functools.lru_cache(maxsize=64)
+def _owner_names(uid: int, gid: int) -> Tuple[str, str]:
+    """User and group names as tarfile records them, looked up once per id pair."""
+    uname = gname = ''
+    if pwd is not None:
+        try:
+            uname = pwd.getpwuid(uid)[0]
+        except KeyError:
+            pass
+    if grp is not None:
+        try:
+            gname = grp.getgrgid(gid)[0]
+        except KeyError:
+            pass
+    return uname, gname
+
+def _plain_tarinfo(entry: os.DirEntry, arcname: str) -> Optional[tarfile.TarInfo]:
+    """
+    Build the TarInfo tar.add would for a plain file, from the entry's cached
+    stat. None for symlinks, special and hard-linked files, which are left
+    to tarfile.
+    """
+    st = entry.stat(follow_symlinks=False)
+    if not stat.S_ISREG(st.st_mode) or st.st_nlink > 1:
+        return None
+    info = tarfile.TarInfo(arcname.replace(os.sep, '/'))
+    info.mode = st.st_mode
+    info.uid, info.gid = st.st_uid, st.st_gid
+    info.size = st.st_size
+    info.mtime = st.st_mtime
+    info.uname, info.gname = _owner_names(st.st_uid, st.st_gid)
+    return info
+
+def _drain(source: BinaryIO, target: BinaryIO, size: int) -> None:
+    """Copy source into target, closing source even on failure."""
+    # Closing the pipe makes a blocked writer on the other end fail
+    # instead of waiting forever
+    with source:
+        shutil.copyfileobj(source, target, size)
+
+class _ParallelGzipWriter:
+    """
+    Write-only file object that gzips fixed-size blocks on a thread pool.
+    
+    Each block becomes its own gzip member, and concatenated members form
+    one valid gzip stream, like pigz output. Blocks are written in order,
+    with a bounded number in flight.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, pool: ThreadPoolExecutor, level: int,
+                 block_size: int, max_pending: int):
+        self._fileobj = fileobj
+        self._pool = pool
+        self._level = level
+        self._block_size = block_size
+        self._max_pending = max_pending
+        self._buffer = bytearray()
+        self._pending: deque = deque()
+        self._written = False
+    
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        block_size = self._block_size
+        while len(self._buffer) >= block_size:
+            self._submit(bytes(self._buffer[:block_size]))
+            del self._buffer[:block_size]
+        return len(data)
+    
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._pool.submit(gzip.compress, block, self._level))
+        self._written = True
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.popleft().result())
+    
+    def flush(self) -> None:
+        """Compress what is buffered and write every pending block."""
+        # An empty stream still needs one member to be valid gzip
+        if self._buffer or not self._written:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._fileobj.write(self._pending.popleft().result())
+
 class StegoInteractive:
     """Interactive terminal interface for steganography operations."""
     
+    SPOOL_MAX_SIZE = 128 * 1024 * 1024  # Folder archives kept in memory up to this size
+    READ_CHUNK_SIZE = 1024 * 1024  # Bytes read per chunk when streaming data to embed
+    # ustar header plus the PAX extended header tarfile adds for sub-second mtimes
+    TAR_MEMBER_OVERHEAD = 3 * tarfile.BLOCKSIZE
+    TEMP_PNG_COMPRESS_LEVEL = 1  # zlib level for converted temp images (PNG default is 6)
+    TAR_COPY_BUFFER_SIZE = 1024 * 1024  # Chunk size tarfile copies members in (default 16 KiB)
+    GZIP_LEVEL = 6  # gzip level without zstandard (tarfile defaults to the much slower 9)
+    GZIP_BLOCK_SIZE = 1024 * 1024  # Bytes per gzip member compressed in parallel
+    PREFETCH_WORKERS = 4  # Threads reading files ahead of the archive writer
+    PREFETCH_DEPTH = 32  # Files read ahead at most
+    PREFETCH_MAX_FILE_SIZE = 1024 * 1024  # Larger files are streamed by tarfile instead
+    PROGRESS_BATCH = 64  # Files archived per progress bar update
+    
+    # Static main menu parts, built once rather than re-parsed every loop
+    MAIN_MENU_TITLE = Text.from_markup("\n[bold cyan]Main Menu[/]")
+    MAIN_MENU_OPTIONS = Text(
+        "1. Embed data\n"
+        "2. Extract data\n"
+        "3. Create carrier image\n"
+        "4. Switch Mode\n"
+        "5. Exit"
+    )
+    MAIN_MENU_CHOICES = ["1", "2", "3", "4", "5"]
+    
     def __init__(self):
         """Initialize the interactive interface."""
         self.console = Console()
@@ -56,6 +277,7 @@ def __init__(self):
                 '.env/*'
             }
         }
+        self._sorted_excludes_cache: Optional[Tuple[str, ...]] = None
         self.temp_files: List[Path] = []
         # Create a temp directory in current working directory
         self.temp_dir = Path('temp_stego')
@@ -105,14 +327,17 @@ def switch_mode(self):
     def initialize_stego(self, password: str = None, base_emoji: str = None):
         """Initialize the appropriate stego engine."""
         if self.mode == "production":
+            from ez_steg.ez_steg_core import StegoProduction
             if not password:
                 password = Prompt.ask("Enter password for encryption", password=True)
             self.stego = StegoProduction(password)
         elif self.mode == "emoji":
+            from ez_steg.ez_steg_emoji import StegoEmoji
             if not base_emoji:
                 base_emoji = Prompt.ask("Enter base emoji (press Enter for default)", default="🌟")
             self.stego = StegoEmoji(base_emoji)
         else:
+            from ez_steg.ez_steg_lite import StegoLite
             self.stego = StegoLite()
     
     def get_password(self) -> str:
@@ -133,11 +358,12 @@ def get_password(self) -> str:
     def validate_path(self, path: str, must_exist: bool = True) -> Optional[Path]:
         """Validate file path and return Path object."""
         try:
-            path_obj = Path(path).resolve()
-            if must_exist and not path_obj.exists():
-                self.console.print(f"[red]Path does not exist: {path}[/]")
-                return None
-            return path_obj
+            # A strict resolve fails on missing paths, so existence needs
+            # no separate stat
+            return Path(path).resolve(strict=must_exist)
+        except FileNotFoundError:
+            self.console.print(f"[red]Path does not exist: {path}[/]")
+            return None
         except Exception as e:
             self.console.print(f"[red]Invalid path: {e}[/]")
             return None
@@ -147,6 +373,7 @@ def check_image_capacity(self, image_path: Path, data_size: int) -> bool:
         try:
             # Initialize stego if not already done
             if not self.stego:
+                from ez_steg.ez_steg_core import ValidationError
                 raise ValidationError("Stego engine not initialized")
                 
             # Get capacity
@@ -175,12 +402,108 @@ def check_image_capacity(self, image_path: Path, data_size: int) -> bool:
     
     def should_exclude(self, path: Path, exclude_patterns: Set[str]) -> bool:
         """Check if a path should be excluded based on patterns."""
-        path_str = str(path)
-        return any(
-            fnmatch.fnmatch(path_str, pattern) or
-            fnmatch.fnmatch(path.name, pattern)
-            for pattern in exclude_patterns
-        )
+        name_re, path_re = _compile_excludes(frozenset(exclude_patterns))
+        # The cheap name check settles most paths; fall back to the full path
+        if name_re is not None and name_re.match(os.path.normcase(path.name)):
+            return True
+        return path_re is not None and path_re.match(os.path.normcase(str(path))) is not None
+    
+    def _scan_entries(self, folder: Path,
+                      exclude_patterns: Set[str]) -> Tuple[List[Tuple[os.DirEntry, str]], int]:
+        """
+        Walk a folder once with os.scandir, collecting the files to archive.
+        
+        Directories matching a "name/*" pattern or a literal bare name such
+        as "build" are pruned without being descended into. Like os.walk,
+        symlinked directories are not followed.
+        
+        Returns:
+            Tuple of ([(entry, arcname), ...], number of excluded entries)
+        """
+        dir_re = _compile_dir_excludes(exclude_patterns)
+        name_re, path_re = _compile_excludes(frozenset(exclude_patterns))
+        included: List[Tuple[os.DirEntry, str]] = []
+        excluded = 0
+        
+        # Locals for the per-directory loop
+        join, scandir = os.path.join, os.scandir
+        extend = included.extend
+        
+        pending = [(os.fspath(folder), '')]
+        while pending:
+            dirpath, rel_dir = pending.pop()
+            with scandir(dirpath) as it:
+                entries = list(it)
+            
+            # DirEntry.is_dir reuses the file type scandir already read
+            dirs, files = [], []
+            for entry in entries:
+                (dirs if entry.is_dir() else files).append(entry)
+            
+            kept = _unmatched([entry.name for entry in dirs], dir_re, dirs)
+            excluded += len(dirs) - len(kept)
+            pending.extend(
+                (entry.path, join(rel_dir, entry.name) if rel_dir else entry.name)
+                for entry in kept if not entry.is_symlink()
+            )
+            
+            # Filter the whole directory listing at once: names first, then
+            # the full paths of the survivors
+            kept = _unmatched([entry.name for entry in files], name_re, files)
+            kept = _unmatched([entry.path for entry in kept], path_re, kept)
+            excluded += len(files) - len(kept)
+            extend((entry, join(rel_dir, entry.name) if rel_dir else entry.name) for entry in kept)
+        
+        return included, excluded
+    
+    def _scan_tree(self, folder: Path, exclude_patterns: Set[str]) -> Tuple[List[Tuple[str, str]], int]:
+        """
+        Walk a folder once, collecting the files to archive.
+        
+        Returns:
+            Tuple of ([(path, arcname), ...], number of excluded entries)
+        """
+        entries, excluded = self._scan_entries(folder, exclude_patterns)
+        return [(entry.path, arcname) for entry, arcname in entries], excluded
+    
+    def _estimate_folder_size(self, folder: Path, exclude_patterns: Set[str]) -> int:
+        """
+        Estimate the archive size of a folder without building the archive.
+        
+        Sums the sizes of the included files plus tar's per-member headers
+        and padding (longer PAX headers for very long names are not
+        counted). Compression is not modelled, so for compressed modes this
+        is an upper bound.
+        """
+        entries, _ = self._scan_entries(folder, exclude_patterns)
+        
+        total = 0
+        for entry, _ in entries:
+            # Header blocks plus the data padded to 512-byte blocks; links
+            # and other special files carry no data
+            size = entry.stat().st_size if entry.is_file(follow_symlinks=False) else 0
+            total += self.TAR_MEMBER_OVERHEAD + -(-size // 512) * 512
+        
+        # End-of-archive blocks, then padding to a full record
+        total += 1024
+        return -(-total // tarfile.RECORDSIZE) * tarfile.RECORDSIZE
+    
+    @property
+    def default_excludes(self) -> Set[str]:
+        """Default exclusion patterns; assign here so the sorted view is refreshed."""
+        return self.config['default_excludes']
+    
+    @default_excludes.setter
+    def default_excludes(self, patterns: Set[str]):
+        self.config['default_excludes'] = patterns
+        self._sorted_excludes_cache = None
+    
+    @property
+    def sorted_excludes(self) -> Tuple[str, ...]:
+        """Default exclusion patterns in display order, sorted once per change."""
+        if self._sorted_excludes_cache is None:
+            self._sorted_excludes_cache = tuple(sorted(self.config['default_excludes']))
+        return self._sorted_excludes_cache
     
     def get_exclude_patterns(self) -> Set[str]:
         """Get exclusion patterns from user."""
@@ -188,7 +511,7 @@ def get_exclude_patterns(self) -> Set[str]:
         
         self.console.print("\n[yellow]Default Exclusion Patterns:[/]")
         table = Table(show_header=False)
-        for pattern in sorted(patterns):
+        for pattern in self.sorted_excludes:
             table.add_row(pattern)
         self.console.print(table)
         
@@ -211,9 +534,12 @@ def get_exclude_patterns(self) -> Set[str]:
                     self.console.print(f"[green]Added pattern: {pattern}[/]")
             
             elif action == "2":
-                while patterns:
+                # The patterns are still the defaults here; a removal drops
+                # its entry, which keeps the rest in order
+                sorted_patterns = list(self.sorted_excludes)
+                while sorted_patterns:
                     self.console.print("\nCurrent patterns:")
-                    for i, pattern in enumerate(sorted(patterns), 1):
+                    for i, pattern in enumerate(sorted_patterns, 1):
                         self.console.print(f"{i}. {pattern}")
                     
                     choice = Prompt.ask(
@@ -225,7 +551,9 @@ def get_exclude_patterns(self) -> Set[str]:
                     
                     try:
                         idx = int(choice) - 1
-                        pattern = sorted(patterns)[idx]
+                        if idx < 0:
+                            raise IndexError(idx)
+                        pattern = sorted_patterns.pop(idx)
                         patterns.remove(pattern)
                         self.console.print(f"[yellow]Removed pattern: {pattern}[/]")
                     except (ValueError, IndexError):
@@ -238,8 +566,53 @@ def get_exclude_patterns(self) -> Set[str]:
         
         return patterns
     
-    def compress_folder(self, folder_path: Path) -> Optional[Path]:
-        """Compress a folder into a temporary archive."""
+    @contextlib.contextmanager
+    def _open_archive(self, fileobj: BinaryIO):
+        """Open a tar archive writing into fileobj, compressed unless in Lite mode."""
+        if self.mode == "lite":
+            with tarfile.open(fileobj=fileobj, mode='w|', bufsize=self.TAR_COPY_BUFFER_SIZE,
+                              copybufsize=self.TAR_COPY_BUFFER_SIZE) as tar:
+                yield tar
+            return
+        if zstandard is None:
+            pigz = shutil.which('pigz')
+            if pigz is None:
+                # Gzip blocks on a thread pool instead; zlib releases the GIL
+                workers = os.cpu_count() or 1
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    writer = _ParallelGzipWriter(fileobj, pool, self.GZIP_LEVEL,
+                                                 self.GZIP_BLOCK_SIZE, 2 * workers)
+                    with tarfile.open(fileobj=writer, mode='w|',
+                                      copybufsize=self.TAR_COPY_BUFFER_SIZE) as tar:
+                        yield tar
+                    writer.flush()
+                return
+            
+            # Parallel gzip in a subprocess; a worker thread copies its
+            # output into fileobj, which need not be a real file
+            proc = subprocess.Popen([pigz, f'-{self.GZIP_LEVEL}', '-c'],
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                copy = pool.submit(_drain, proc.stdout, fileobj, self.TAR_COPY_BUFFER_SIZE)
+                try:
+                    with tarfile.open(fileobj=proc.stdin, mode='w|',
+                                      copybufsize=self.TAR_COPY_BUFFER_SIZE) as tar:
+                        yield tar
+                finally:
+                    proc.stdin.close()
+                    copy.result()
+                    if proc.wait():
+                        raise OSError(f"pigz exited with status {proc.returncode}")
+            return
+        
+        # Multi-threaded zstd behind a streaming tar
+        compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+        with compressor.stream_writer(fileobj, closefd=False) as writer, \
+                tarfile.open(fileobj=writer, mode='w|', copybufsize=self.TAR_COPY_BUFFER_SIZE) as tar:
+            yield tar
+    
+    def archive_folder(self, folder_path: Path, fileobj: BinaryIO) -> bool:
+        """Write a compressed archive of a folder into a binary file object."""
         try:
             # Get exclusion patterns
             exclude_patterns = self.get_exclude_patterns()
@@ -251,51 +624,79 @@ def compress_folder(self, folder_path: Path) -> Optional[Path]:
             ) as progress:
                 task = progress.add_task("Analyzing folder...", total=None)
                 
-                # Create temporary file in our temp directory
-                timestamp = int(time.time())
-                temp_file = self.temp_dir / f"archive_{timestamp}.tar.gz"
-                self.temp_files.append(temp_file)
-                
-                # Count total files for progress (excluding filtered ones)
-                total_files = sum(
-                    1 for f in folder_path.rglob('*')
-                    if f.is_file() and not self.should_exclude(f, exclude_patterns)
-                )
+                # Collect included files in a single pass over the tree
+                included, excluded = self._scan_entries(folder_path, exclude_patterns)
+                total_files = len(included)
                 
                 if total_files == 0:
                     self.console.print("[red]No files to compress after applying exclusion patterns[/]")
-                    return None
+                    return False
                 
                 progress.update(task, description="Compressing folder...", total=total_files)
                 
                 # Create archive
                 try:
-                    with tarfile.open(temp_file, 'w:gz') as tar:
+                    with self._open_archive(fileobj) as tar:
+                        # Bind the per-file calls to locals for the hot loop
+                        add, addfile = tar.add, tar.addfile
+                        advance = progress.advance
+                        batch = self.PROGRESS_BATCH
                         files_added = 0
-                        for file_path in folder_path.rglob('*'):
-                            if file_path.is_file() and not self.should_exclude(file_path, exclude_patterns):
-                                arcname = file_path.relative_to(folder_path)
-                                tar.add(file_path, arcname=str(arcname))
+                        
+                        # Plain files get their headers from the stat the
+                        # walk cached instead of a second one in tar.add
+                        infos = [_plain_tarinfo(entry, arcname) for entry, arcname in included]
+                        
+                        # Worker threads read small files ahead, a bounded
+                        # window at a time, while this thread only writes
+                        # the tar stream; members stay in order
+                        limit = self.PREFETCH_MAX_FILE_SIZE
+                        with ThreadPoolExecutor(max_workers=self.PREFETCH_WORKERS) as pool:
+                            reads = (
+                                pool.submit(_read_file, entry.path)
+                                if info is not None and info.size <= limit else None
+                                for (entry, _), info in zip(included, infos)
+                            )
+                            pending = deque(itertools.islice(reads, self.PREFETCH_DEPTH))
+                            for (entry, arcname), info in zip(included, infos):
+                                read = pending.popleft()
+                                pending.extend(itertools.islice(reads, 1))
+                                
+                                if info is None:
+                                    # Links and special files are handled by tarfile
+                                    add(entry.path, arcname=arcname, recursive=False)
+                                elif read is None:
+                                    # Large files are copied in TAR_COPY_BUFFER_SIZE chunks
+                                    with open(entry.path, 'rb') as f:
+                                        addfile(info, f)
+                                else:
+                                    data = read.result()
+                                    if data is not None and len(data) == info.size:
+                                        addfile(info, io.BytesIO(data))
+                                    else:
+                                        # Unreadable or changed since the walk
+                                        add(entry.path, arcname=arcname, recursive=False)
                                 files_added += 1
-                                progress.advance(task)
+                                # Each update locks and refreshes the bar,
+                                # so only do it once per batch of files
+                                if not files_added % batch:
+                                    advance(task, batch)
+                        advance(task, files_added % batch)
                 except Exception as e:
                     self.console.print(f"[red]Error creating archive: {e}[/]")
-                    return None
-                
-                # Show summary
-                excluded = sum(1 for f in folder_path.rglob('*')
-                             if f.is_file() and self.should_exclude(f, exclude_patterns))
+                    return False
                 
+                # Show summary; pruned folders count once
                 self.console.print(
                     f"[green]✓ Folder compressed:[/]\n"
                     f"  - {files_added} files included\n"
-                    f"  - {excluded} files excluded"
+                    f"  - {excluded} files or folders excluded"
                 )
-                return temp_file
+                return True
                 
         except Exception as e:
             self.console.print(f"[red]Error compressing folder: {e}[/]")
-            return None
+            return False
     
     def cleanup_temp_files(self):
         """Clean up temporary files."""
@@ -316,18 +717,26 @@ def cleanup_temp_files(self):
     
     def validate_and_convert_image(self, image_path: Path) -> Optional[Path]:
         """Validate image and convert to RGB if needed."""
+        import numpy as np
+        from PIL import Image
         try:
             with Image.open(image_path) as img:
                 if img.mode == 'RGB':
                     return image_path
                 
                 self.console.print(f"[yellow]Converting image from {img.mode} to RGB mode...[/]")
-                # Convert to RGB
-                rgb_img = img.convert('RGB')
+                # Convert to RGB; RGBA just drops its alpha plane, which a
+                # NumPy slice does without a per-pixel conversion
+                if img.mode == 'RGBA':
+                    rgb = np.ascontiguousarray(np.asarray(img)[:, :, :3])
+                    rgb_img = Image.fromarray(rgb, 'RGB')
+                else:
+                    rgb_img = img.convert('RGB')
                 
-                # Save converted image in temp directory
+                # Save converted image in temp directory; it is only read back
+                # once, so favour encode speed over file size
                 converted_path = self.temp_dir / f"converted_{image_path.name}"
-                rgb_img.save(converted_path, 'PNG')
+                rgb_img.save(converted_path, 'PNG', compress_level=self.TEMP_PNG_COMPRESS_LEVEL)
                 self.temp_files.append(converted_path)
                 
                 self.console.print("[green]✓ Image converted successfully[/]")
@@ -337,123 +746,144 @@ def validate_and_convert_image(self, image_path: Path) -> Optional[Path]:
             self.console.print(f"[red]Error processing image: {e}[/]")
             return None
     
+    @contextlib.contextmanager
+    def _map_file(self, path: Path):
+        """Map a file read-only, so pages are loaded on demand rather than copied."""
+        with open(path, 'rb') as f:
+            # Empty files cannot be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            except BaseException:
+                # A failed engine's traceback may still hold a view of the
+                # map; the map is then freed with it, and the original
+                # error is the one to report
+                with contextlib.suppress(BufferError):
+                    mapped.close()
+                raise
+            mapped.close()
+    
     def embed_data(self):
         """Embed data into an image or emoji string."""
         self.console.print("\n[bold cyan]Embed Data[/]")
         
         if self.mode == "emoji":
-            # Ask for input type
-            self.console.print("\nInput type:")
-            table = Table(show_header=False)
-            table.add_row("1. File/Folder", "[yellow]Embed data from a file or folder[/]")
-            table.add_row("2. Direct Text", "[yellow]Type or paste text directly[/]")
-            self.console.print(table)
-            
-            input_type = Prompt.ask(
-                "Choice",
-                choices=["1", "2"],
-                default="1"
-            )
-            
-            data = None
-            if input_type == "1":
-                # Get data to embed from file/folder
-                while True:
-                    data_path = Prompt.ask("Enter path to data file/folder to embed")
-                    data_path = self.validate_path(data_path)
-                    if data_path and (data_path.is_file() or data_path.is_dir()):
-                        break
-                    self.console.print("[red]Please provide a valid file/folder path[/]")
-                
-                try:
-                    # Prepare data
-                    if data_path.is_dir():
-                        data_file = self.compress_folder(data_path)
-                        if not data_file:
-                            return
-                        with open(data_file, 'rb') as f:
-                            data = f.read()
-                    else:
-                        with open(data_path, 'rb') as f:
-                            data = f.read()
-                except Exception as e:
-                    self.console.print(f"[red]Error reading data: {e}[/]")
-                    return
-                finally:
-                    if data_path.is_dir() and 'data_file' in locals():
-                        data_file.unlink()
+            # Mapped input files stay open until the text is written
+            with contextlib.ExitStack() as resources:
+                # Ask for input type
+                self.console.print("\nInput type:")
+                table = Table(show_header=False)
+                table.add_row("1. File/Folder", "[yellow]Embed data from a file or folder[/]")
+                table.add_row("2. Direct Text", "[yellow]Type or paste text directly[/]")
+                self.console.print(table)
                 
-                # Default output path based on input file
-                default_output = str(data_path) + "_emoji.txt"
+                input_type = Prompt.ask(
+                    "Choice",
+                    choices=["1", "2"],
+                    default="1"
+                )
                 
-            else:  # Direct text input
-                # Get text input
-                self.console.print("\nEnter the text to embed (press Ctrl+D or Ctrl+Z on a new line to finish):")
-                lines = []
-                try:
+                data = None
+                if input_type == "1":
+                    # Get data to embed from file/folder
                     while True:
-                        line = input()
-                        lines.append(line)
-                except (EOFError, KeyboardInterrupt):
-                    pass
+                        data_path = Prompt.ask("Enter path to data file/folder to embed")
+                        data_path = self.validate_path(data_path)
+                        if data_path:
+                            is_dir = data_path.is_dir()
+                            if is_dir or data_path.is_file():
+                                break
+                        self.console.print("[red]Please provide a valid file/folder path[/]")
+                    
+                    try:
+                        # Prepare data; the encoded text is built in memory
+                        # anyway, so folders are archived straight into a buffer
+                        if is_dir:
+                            buffer = io.BytesIO()
+                            if not self.archive_folder(data_path, buffer):
+                                return
+                            data = buffer.getbuffer()
+                        else:
+                            data = resources.enter_context(self._map_file(data_path))
+                    except Exception as e:
+                        self.console.print(f"[red]Error reading data: {e}[/]")
+                        return
+                    
+                    # Default output path based on input file
+                    default_output = str(data_path) + "_emoji.txt"
+                    
+                else:  # Direct text input
+                    # Get text input
+                    self.console.print("\nEnter the text to embed (press Ctrl+D or Ctrl+Z on a new line to finish):")
+                    lines = []
+                    try:
+                        while True:
+                            line = input()
+                            lines.append(line)
+                    except (EOFError, KeyboardInterrupt):
+                        pass
+                    
+                    if not lines:
+                        self.console.print("[red]No text entered[/]")
+                        return
+                    
+                    # Join lines with newlines and encode as UTF-8
+                    data = '\n'.join(lines).encode('utf-8')
+                    
+                    # Default output path with timestamp
+                    timestamp = int(time.time())
+                    default_output = f"encoded_text_{timestamp}_emoji.txt"
                 
-                if not lines:
-                    self.console.print("[red]No text entered[/]")
+                if not data:
+                    self.console.print("[red]No data to embed[/]")
                     return
                 
-                # Join lines with newlines and encode as UTF-8
-                data = '\n'.join(lines).encode('utf-8')
+                # Initialize stego engine
+                from ez_steg.ez_steg_emoji import StegoEmoji
+                base_emoji = Prompt.ask("Enter base emoji (press Enter for default)", default="🌟")
+                self.stego = StegoEmoji(base_emoji)
                 
-                # Default output path with timestamp
-                timestamp = int(time.time())
-                default_output = f"encoded_text_{timestamp}_emoji.txt"
-            
-            if not data:
-                self.console.print("[red]No data to embed[/]")
-                return
-            
-            # Initialize stego engine
-            base_emoji = Prompt.ask("Enter base emoji (press Enter for default)", default="🌟")
-            self.stego = StegoEmoji(base_emoji)
-            
-            # Get output path
-            output_path = Prompt.ask(
-                "Enter output path (press Enter for default)",
-                default=default_output
-            )
-            output_path = Path(output_path)
-            
-            if output_path.exists():
-                if not Confirm.ask(f"[yellow]File {output_path} already exists. Overwrite?[/]"):
+                # Get output path
+                output_path = Prompt.ask(
+                    "Enter output path (press Enter for default)",
+                    default=default_output
+                )
+                output_path = Path(output_path)
+                
+                if output_path.exists():
+                    if not Confirm.ask(f"[yellow]File {output_path} already exists. Overwrite?[/]"):
+                        return
+                
+                # Show size estimate
+                char_count, human_size = self.stego.get_size_estimate(len(data))
+                self.console.print(f"\n[yellow]Size estimate: {human_size}[/]")
+                
+                if not Confirm.ask("\nProceed with embedding?"):
                     return
-            
-            # Show size estimate
-            char_count, human_size = self.stego.get_size_estimate(len(data))
-            self.console.print(f"\n[yellow]Size estimate: {human_size}[/]")
-            
-            if not Confirm.ask("\nProceed with embedding?"):
-                return
-            
-            try:
-                # Embed data
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=self.console,
-                ) as progress:
-                    progress.add_task("Embedding data...", total=None)
-                    emoji_text = self.stego.embed(data)
-                    
-                    # Save result
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(emoji_text)
                 
-                self.console.print(f"\n[green]✓ Data embedded successfully![/]")
-                self.console.print(f"Output saved to: {output_path}")
+                try:
+                    # Embed data
+                    with Progress(
+                        SpinnerColumn(),
+                        TextColumn("[progress.description]{task.description}"),
+                        console=self.console,
+                    ) as progress:
+                        progress.add_task("Embedding data...", total=None)
+                        emoji_text = self.stego.embed(data)
+                        
+                        # Save result
+                        with open(output_path, 'w', encoding='utf-8') as f:
+                            f.write(emoji_text)
+                    
+                    self.console.print(f"\n[green]✓ Data embedded successfully![/]")
+                    self.console.print(f"Output saved to: {output_path}")
+                    
+                except Exception as e:
+                    self.console.print(f"[red]Error embedding data: {e}[/]")
                 
-            except Exception as e:
-                self.console.print(f"[red]Error embedding data: {e}[/]")
-            
         else:
             # Get carrier image
             while True:
@@ -467,17 +897,29 @@ def embed_data(self):
             while True:
                 data_path = Prompt.ask("Enter path to data file/folder to embed")
                 data_path = self.validate_path(data_path)
-                if data_path and (data_path.is_file() or data_path.is_dir()):
-                    break
+                if data_path:
+                    # Checked once here rather than stat()ed at every use
+                    is_dir = data_path.is_dir()
+                    if is_dir or data_path.is_file():
+                        break
                 self.console.print("[red]Please provide a valid file/folder path[/]")
             
+            # Take the password now, but only build the engine once the
+            # embed is confirmed
+            password = self._prompt_password() if self.mode == "production" else None
+            
             try:
-                # Prepare data and check capacity
-                if data_path.is_dir():
-                    data_file = self.compress_folder(data_path)
-                    if not data_file:
+                # Prepare data and check capacity; folders are archived into
+                # a spooled buffer that only spills to disk when large
+                if is_dir:
+                    data_file = tempfile.SpooledTemporaryFile(
+                        max_size=self.SPOOL_MAX_SIZE, dir=self.temp_dir
+                    )
+                    if not self.archive_folder(data_path, data_file):
+                        data_file.close()
                         return
-                    data_size = data_file.stat().st_size
+                    data_size = data_file.tell()
+                    data_file.seek(0)
                 else:
                     data_file = data_path
                     data_size = data_path.stat().st_size
@@ -496,34 +938,74 @@ def embed_data(self):
                 self.console.print(table)
                 
                 if not Confirm.ask("\nProceed with embedding?"):
-                    if data_path.is_dir():
-                        data_file.unlink()
+                    if is_dir:
+                        data_file.close()
                     return
                 
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=self.console,
-                ) as progress:
-                    progress.add_task("Reading data...", total=None)
-                    with open(data_file, 'rb') as f:
-                        data = f.read()
-                
-                    progress.add_task("Embedding data...", total=None)
-                    # Call embed with correct parameter order: data, input_path, output_path
-                    self.stego.embed(data, str(image_path), str(output_path))
-                
-                # Clean up temporary file if needed
-                if data_path.is_dir():
-                    data_file.unlink()
+                self.initialize_stego(password)
+                with self._byte_progress() as progress:
+                    # The engine reports each chunk it embeds
+                    task = progress.add_task("Embedding data...", total=data_size)
+                    advance = functools.partial(progress.advance, task)
+                    if is_dir:
+                        # Stream the spooled archive to the engine in chunks
+                        with data_file as f:
+                            chunks = iter(functools.partial(f.read, self.READ_CHUNK_SIZE), b'')
+                            self.stego.embed_stream(chunks, str(image_path), str(output_path), advance)
+                    else:
+                        # Map files rather than reading them into memory
+                        with self._map_file(data_file) as data:
+                            self.stego.embed(data, str(image_path), str(output_path), advance)
                 
                 self.console.print(f"\n[green]✓ Data embedded successfully![/]")
                 self.console.print(f"Output saved to: {output_path}")
                 
             except Exception as e:
                 self.console.print(f"[red]Error embedding data: {e}[/]")
-                if data_path.is_dir() and data_file:
-                    data_file.unlink()
+                if is_dir and data_file:
+                    data_file.close()
+    
+    def _byte_progress(self) -> Progress:
+        """Create a progress bar counting bytes, redrawn at most 4 times a second."""
+        return Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            DownloadColumn(),
+            console=self.console,
+            refresh_per_second=4,
+        )
+    
+    def _prompt_password(self) -> str:
+        """Ask for the encryption password until it is long enough."""
+        while True:
+            password = Prompt.ask("Enter password for encryption", password=True)
+            if len(password) >= 12:
+                return password
+            self.console.print("[red]Password must be at least 12 characters![/]")
+    
+    def _prompt_output_path(self) -> Path:
+        """Ask for a writable output path for extracted data."""
+        while True:
+            output_path = Prompt.ask("Enter output path for extracted data (including filename)")
+            output_path = Path(output_path)
+            
+            try:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if output_path.is_dir():
+                    raise IsADirectoryError(f"{output_path} is a directory")
+                if output_path.exists():
+                    if not Confirm.ask(f"[yellow]File {output_path} already exists. Overwrite?[/]"):
+                        continue
+                # Probe the directory rather than opening the target, which
+                # would truncate a file the user may still need if the
+                # extraction fails; the output replaces it only on success
+                with tempfile.TemporaryFile(dir=output_path.parent):
+                    pass
+                return output_path
+            except (OSError, PermissionError) as e:
+                self.console.print(f"[red]Cannot write to this location: {e}[/]")
+                continue
     
     def extract_data(self):
         """Extract data from an image or emoji string."""
@@ -539,25 +1021,12 @@ def extract_data(self):
                 self.console.print("[red]Please provide a valid file path[/]")
             
             # Initialize stego engine
+            from ez_steg.ez_steg_emoji import StegoEmoji
             base_emoji = Prompt.ask("Enter base emoji (press Enter for default)", default="🌟")
             self.stego = StegoEmoji(base_emoji)
             
             # Get output path
-            while True:
-                output_path = Prompt.ask("Enter output path for extracted data (including filename)")
-                output_path = Path(output_path)
-                
-                try:
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    if output_path.exists():
-                        if not Confirm.ask(f"[yellow]File {output_path} already exists. Overwrite?[/]"):
-                            continue
-                    with open(output_path, 'wb') as f:
-                        pass
-                    break
-                except (OSError, PermissionError) as e:
-                    self.console.print(f"[red]Cannot write to this location: {e}[/]")
-                    continue
+            output_path = self._prompt_output_path()
             
             try:
                 # Read emoji text
@@ -573,8 +1042,8 @@ def extract_data(self):
                     data = self.stego.extract(emoji_text)
                     
                     progress.add_task("Saving data...", total=None)
-                    with open(output_path, 'wb') as f:
-                        f.write(data)
+                    with _replace_on_success(output_path) as f:
+                        _write_all(f, data)
                 
                 self.console.print(f"\n[green]✓ Data extracted successfully![/]")
                 self.console.print(f"Output saved to: {output_path}")
@@ -591,21 +1060,34 @@ def extract_data(self):
                     break
                 self.console.print("[red]Please provide a valid PNG image path[/]")
             
+            # The engine is built once all input is in
+            password = self._prompt_password() if self.mode == "production" else None
+            
+            # Get output path
+            output_path = self._prompt_output_path()
+            
             try:
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    console=self.console,
-                ) as progress:
-                    progress.add_task("Extracting data...", total=None)
-                    data = self.stego.extract(str(image_path))
-                    
-                    progress.add_task("Saving data...", total=None)
-                    with open(image_path, 'wb') as f:
-                        f.write(data)
+                self.initialize_stego(password)
+                with self._byte_progress() as progress:
+                    # The length is only known once the header is read, so
+                    # the engine reports it to set the bar's total
+                    task = progress.add_task("Extracting data...", total=None)
+                    # Write the data out chunk by chunk as it is decoded;
+                    # chunks are already large, so they go straight to the
+                    # file rather than through a write buffer copy.
+                    # Production chunks are only authenticated at the end,
+                    # so they go to a temporary file that replaces the
+                    # output once extraction succeeds
+                    with _replace_on_success(output_path) as f:
+                        chunks = self.stego.extract_iter(
+                            str(image_path), lambda total: progress.update(task, total=total)
+                        )
+                        for chunk in chunks:
+                            _write_all(f, chunk)
+                            progress.advance(task, len(chunk))
                 
                 self.console.print(f"\n[green]✓ Data extracted successfully![/]")
-                self.console.print(f"Output saved to: {image_path}")
+                self.console.print(f"Output saved to: {output_path}")
                 
             except Exception as e:
                 self.console.print(f"[red]Error extracting data: {e}[/]")
@@ -616,7 +1098,7 @@ def show_settings(self):
             self.console.print("\n[bold cyan]Settings[/]")
             self.console.print("\nCurrent exclusion patterns:")
             table = Table(show_header=False)
-            for pattern in sorted(self.config['default_excludes']):
+            for pattern in self.sorted_excludes:
                 table.add_row(pattern)
             self.console.print(table)
             
@@ -629,22 +1111,18 @@ def show_settings(self):
             if choice == "b":
                 break
             elif choice == "1":
-                self.config['default_excludes'] = self.get_exclude_patterns()
+                self.default_excludes = self.get_exclude_patterns()
     
     def main_menu(self):
         """Display the main menu and handle user input."""
         while True:
-            self.console.print("\n[bold cyan]Main Menu[/]")
+            self.console.print(self.MAIN_MENU_TITLE)
             self.console.print(f"[yellow]Current: {self.mode.title()} Mode[/]")
-            self.console.print("1. Embed data")
-            self.console.print("2. Extract data")
-            self.console.print("3. Create carrier image")
-            self.console.print("4. Switch Mode")
-            self.console.print("5. Exit")
+            self.console.print(self.MAIN_MENU_OPTIONS)
             
             choice = Prompt.ask(
                 "Choice",
-                choices=["1", "2", "3", "4", "5"],
+                choices=self.MAIN_MENU_CHOICES,
                 default="1"
             )
             
@@ -674,17 +1152,12 @@ def run(self):
 
     def _format_size(self, size: int) -> str:
         """Format size in a human-readable format."""
-        if size < 1024:
-            return f"{size} bytes"
-        elif size < 1024**2:
-            return f"{size/1024:.2f} KB"
-        elif size < 1024**3:
-            return f"{size/1024**2:.2f} MB"
-        else:
-            return f"{size/1024**3:.2f} GB"
+        return _format_size(size)
 
     def create_carrier_image(self):
         """Create a carrier image based on data size."""
+        import numpy as np
+        from PIL import Image
         self.console.print("\n[bold cyan]Create Carrier Image[/]")
         
         # Get image name
@@ -731,12 +1204,10 @@ def create_carrier_image(self):
                 folder_path = Prompt.ask("Enter folder path to measure")
                 folder_path = self.validate_path(folder_path)
                 if folder_path and folder_path.is_dir():
-                    # Compress folder to get actual size
-                    compressed = self.compress_folder(folder_path)
-                    if compressed:
-                        data_size = compressed.stat().st_size
-                        compressed.unlink()  # Clean up temp file
-                        break
+                    # Estimate the archive size from the tree instead of
+                    # compressing the folder just to measure it
+                    data_size = self._estimate_folder_size(folder_path, self.get_exclude_patterns())
+                    break
                 else:
                     self.console.print("[red]Please provide a valid folder path[/]")
         elif data_type == "3":
@@ -782,8 +1253,10 @@ def create_carrier_image(self):
         # Initialize stego engine if needed
         if not self.stego:
             if self.mode == "production":
+                from ez_steg.ez_steg_core import StegoProduction
                 self.stego = StegoProduction("temporary_password_12345")
             else:
+                from ez_steg.ez_steg_lite import StegoLite
                 self.stego = StegoLite()
         
         # Calculate dimensions
@@ -842,21 +1315,21 @@ def create_carrier_image(self):
                     total_bytes = data_size * margin_factor
                 
                 # Calculate required pixels (3 bits per pixel in RGB)
-                total_bits = total_bytes * 8
-                pixels_needed = math.ceil(total_bits / 3)
+                total_bits = math.ceil(total_bytes * 8)
+                pixels_needed = -(-total_bits // 3)
                 
-                # Calculate dimensions for a square image
-                dimension = math.ceil(math.sqrt(pixels_needed))
+                # Calculate dimensions for a square image; integer math, as
+                # float sqrt loses precision for very large payloads
+                dimension = math.isqrt(pixels_needed)
+                dimension += dimension * dimension < pixels_needed
                 # Round up to nearest multiple of 8 for better compression
-                dimension = math.ceil(dimension / 8) * 8
+                dimension = (dimension + 7) & ~7
                 
-                # Create blank RGB image
-                image = np.zeros((dimension, dimension, 3), dtype=np.uint8)
-                
-                # Add some noise/pattern to make it look more natural
-                for i in range(3):  # For each color channel
-                    noise = np.random.randint(0, 256, (dimension, dimension), dtype=np.uint8)
-                    image[:, :, i] = noise
+                # Fill the whole RGB image with noise in one call so it looks
+                # more natural
+                image = np.random.default_rng().integers(
+                    0, 256, (dimension, dimension, 3), dtype=np.uint8
+                )
                 
                 # Save image
                 Image.fromarray(image).save(output_path, 'PNG')
@@ -5,10 +5,12 @@
 
 import numpy as np
 from PIL import Image
-from typing import Tuple, Optional
+from typing import Callable, Iterable, Iterator, Tuple, Optional
 import struct
 import logging
 
+from ez_steg._kernels import embed_bits, extract_bits
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,50 +21,70 @@ class StegoLite:
     def __init__(self):
         """Initialize the steganography engine."""
         self.LENGTH_BYTES = 4  # Using 4 bytes for length (supports up to 4GB)
+        self.CHUNK_SIZE = 64 * 1024  # Bytes converted per chunk on embed and by extract_iter
+        self.PNG_COMPRESS_LEVEL = 1  # zlib level for output images (PIL default is 6)
+        
+        # Same bit layout as the production engine, so its byte-level
+        # kernels apply: the C extension where built, then Numba, then NumPy
+        self._embed_impl = embed_bits
+        self._extract_impl = extract_bits
+        
+        # Extraction output buffer, reused for reads of up to CHUNK_SIZE bytes
+        self._scratch: Optional[np.ndarray] = None
     
     def _get_capacity(self, image: np.ndarray) -> int:
         """Calculate available bytes for data storage."""
+        return self._capacity_for(image.size)
+    
+    def _capacity_for(self, num_values: int) -> int:
+        """Calculate available bytes for data storage in num_values channel values."""
         # We can use 1 bit per color channel (RGB)
         # Each byte of data needs 8 bits, so divide by 8
         # Subtract length prefix bytes
-        return (image.size // 24) - self.LENGTH_BYTES
+        return (num_values // 24) - self.LENGTH_BYTES
     
-    def _bits_from_bytes(self, data: bytes) -> np.ndarray:
-        """Convert bytes to bit array."""
-        # Convert each byte to 8 bits
-        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
-        return bits
-    
-    def _bytes_from_bits(self, bits: np.ndarray) -> bytes:
-        """Convert bit array back to bytes."""
-        # Ensure we have complete bytes (multiple of 8 bits)
-        padding = (8 - (len(bits) % 8)) % 8
-        if padding:
-            bits = np.pad(bits, (0, padding))
-        return np.packbits(bits).tobytes()
-    
-    def _embed_bits(self, image: np.ndarray, bits: np.ndarray) -> np.ndarray:
-        """Embed bits into image LSBs."""
-        # Create a copy of the image to modify
-        modified = image.copy()
+    def _embed_bits(self, image: np.ndarray, data: bytes, offset: int = 0,
+                    progress: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Embed the bits of data into image LSBs in place, starting at bit offset.
         
+        progress, if given, is called with the byte count of each chunk.
+        """
         # Flatten image to make it easier to work with
-        flat_image = modified.ravel()
+        flat_image = image.ravel()
+        payload = np.frombuffer(data, dtype=np.uint8)
         
-        # Clear LSBs of pixels we'll use
-        flat_image[:len(bits)] &= 0xFE  # Clear LSB
-        
-        # Set LSBs according to our data
-        flat_image[:len(bits)] |= bits
-        
-        return modified
+        # Each payload byte maps onto 8 whole image bytes, so the kernels
+        # write LSBs straight from the packed bytes without a bit array;
+        # chunks keep the NumPy kernel's lookup rows in cache
+        for start in range(0, payload.size, self.CHUNK_SIZE):
+            part = payload[start:start + self.CHUNK_SIZE]
+            first = offset + start * 8
+            region = flat_image[first:first + part.size * 8]
+            self._embed_impl(region, region, part)
+            if progress is not None:
+                progress(part.size)
     
-    def _extract_bits(self, image: np.ndarray, num_bits: int) -> np.ndarray:
-        """Extract bits from image LSBs."""
-        # Get LSBs from flattened image
-        return image.ravel()[:num_bits] & 1
+    def _scratch_buffer(self, nbytes: int) -> np.ndarray:
+        """Return an nbytes buffer, reusing the scratch buffer for chunk-sized reads."""
+        # Larger reads get a one-off buffer, so a big extract() does not
+        # leave its whole payload's worth of memory on the instance
+        if nbytes > self.CHUNK_SIZE:
+            return np.empty(nbytes, dtype=np.uint8)
+        if self._scratch is None or self._scratch.size < nbytes:
+            self._scratch = np.empty(self.CHUNK_SIZE, dtype=np.uint8)
+        return self._scratch[:nbytes]
     
-    def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
+    def _extract_bytes(self, image: np.ndarray, nbytes: int, offset: int = 0) -> bytes:
+        """Extract nbytes bytes from image LSBs, starting at bit offset."""
+        # tobytes() copies out, so the buffer can serve the next call
+        out = self._scratch_buffer(nbytes)
+        self._extract_impl(image.ravel()[offset:offset + nbytes * 8], out)
+        return out.tobytes()
+    
+    def embed(self, data: bytes, input_path: str, output_path: str,
+              progress: Optional[Callable[[int], None]] = None,
+              compress_level: Optional[int] = None) -> bool:
         """
         Embed data into an image.
         
@@ -70,6 +92,11 @@ def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
             data: Bytes to embed
             input_path: Path to input image
             output_path: Path to save output image
+            progress: Optional callback, given the byte count of each
+                embedded chunk
+            compress_level: zlib level (0-9) for the output PNG; defaults to
+                PNG_COMPRESS_LEVEL. Higher levels give smaller files for
+                much more encode time
             
         Returns:
             bool: True if successful
@@ -99,16 +126,21 @@ def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
             # Prepare length prefix (4 bytes, big-endian)
             length_prefix = struct.pack('>I', len(data))
             
-            # Convert all data to bits
-            length_bits = self._bits_from_bytes(length_prefix)
-            data_bits = self._bits_from_bytes(data)
-            all_bits = np.concatenate([length_bits, data_bits])
-            
-            # Embed into image
-            modified = self._embed_bits(image, all_bits)
+            # Embed the prefix and the data straight into the decoded
+            # buffer, without joining their bits first. np.array already
+            # made a fresh array, so no second copy is needed; ravel() must
+            # be a view for the writes to land
+            image = np.require(image, requirements=['C', 'W'])
+            self._embed_bits(image, length_prefix)
+            self._embed_bits(image, data, self.LENGTH_BYTES * 8, progress)
             
-            # Save result directly
-            Image.fromarray(modified).save(output_path, 'PNG')
+            # Save result directly; LSB noise compresses poorly, so a low
+            # zlib level costs little size and saves most of the encode time
+            if compress_level is None:
+                compress_level = self.PNG_COMPRESS_LEVEL
+            Image.fromarray(image).save(
+                output_path, 'PNG', compress_level=compress_level, optimize=False
+            )
             logger.info(f"Successfully embedded {len(data)} bytes of data")
             return True
             
@@ -116,6 +148,66 @@ def embed(self, data: bytes, input_path: str, output_path: str) -> bool:
             logger.error(f"Embedding failed: {str(e)}")
             raise
     
+    def embed_stream(self, chunks: Iterable[bytes], input_path: str, output_path: str,
+                     progress: Optional[Callable[[int], None]] = None,
+                     compress_level: Optional[int] = None) -> bool:
+        """
+        Embed data read from an iterable of byte chunks.
+        
+        The length prefix comes first in this format, so the chunks are
+        collected before embedding.
+        
+        Args:
+            chunks: Iterable of bytes-like chunks, e.g. from a file object
+            input_path: Path to input image
+            output_path: Path to save output image
+            progress: Optional callback, given the byte count of each
+                embedded chunk
+            compress_level: zlib level for the output PNG, as for embed
+            
+        Returns:
+            bool: True if successful
+        """
+        return self.embed(b''.join(chunks), input_path, output_path, progress, compress_level)
+    
+    def _read_rows(self, img: Image.Image, num_bits: int) -> np.ndarray:
+        """
+        Return the first rows of an open image holding num_bits LSBs.
+        
+        PIL still decodes the whole PNG on crop; only the RGB conversion
+        and the array copy are limited to those rows.
+        """
+        width, height = img.size
+        rows = min(height, -(-num_bits // (3 * width)))
+        head = img.crop((0, 0, width, rows))
+        if head.mode != 'RGB':
+            head = head.convert('RGB')
+        # Only read, so the decoded buffer need not be writable
+        return np.asarray(head)
+    
+    def _open_payload(self, input_path: str) -> Tuple[np.ndarray, int]:
+        """Load an image and validate its length prefix; returns (flat values, data length)."""
+        with Image.open(input_path) as img:
+            if img.mode != 'RGB':
+                logger.info(f"Converting image from {img.mode} to RGB")
+            width, height = img.size
+            
+            # Extract length prefix first (4 bytes = 32 bits), converting
+            # only the first row
+            prefix_bits = self.LENGTH_BYTES * 8
+            head = self._read_rows(img, prefix_bits)
+            data_length = int.from_bytes(self._extract_bytes(head, self.LENGTH_BYTES), 'big')
+            
+            # Validate length; the capacity follows from the image size
+            capacity = self._capacity_for(width * height * 3)
+            if data_length > capacity:
+                raise ValueError(f"Invalid length prefix: {data_length} exceeds capacity {capacity}")
+            
+            # Convert and copy only the rows the payload occupies
+            image = self._read_rows(img, prefix_bits + data_length * 8)
+        
+        return image.ravel(), data_length
+    
     def extract(self, input_path: str) -> Optional[bytes]:
         """
         Extract data from an image.
@@ -130,28 +222,11 @@ def extract(self, input_path: str) -> Optional[bytes]:
             ValueError: If invalid image or corrupted data
         """
         try:
-            # Load image
-            with Image.open(input_path) as img:
-                if img.mode != 'RGB':
-                    logger.info(f"Converting image from {img.mode} to RGB")
-                    img = img.convert('RGB')
-                image = np.array(img)
-            
-            # Extract length prefix first (4 bytes = 32 bits)
-            length_bits = self._extract_bits(image, self.LENGTH_BYTES * 8)
-            length_bytes = self._bytes_from_bits(length_bits)
-            data_length = struct.unpack('>I', length_bytes)[0]
-            
-            # Validate length
-            capacity = self._get_capacity(image)
-            if data_length > capacity:
-                raise ValueError(f"Invalid length prefix: {data_length} exceeds capacity {capacity}")
+            image, data_length = self._open_payload(input_path)
             
             # Extract data bits
-            data_bits = self._extract_bits(image, data_length * 8 + self.LENGTH_BYTES * 8)[self.LENGTH_BYTES * 8:]
+            data = self._extract_bytes(image, data_length, self.LENGTH_BYTES * 8)
             
-            # Convert back to bytes
-            data = self._bytes_from_bits(data_bits)
             logger.info(f"Successfully extracted {len(data)} bytes of data")
             return data
             
@@ -159,6 +234,38 @@ def extract(self, input_path: str) -> Optional[bytes]:
             logger.error(f"Extraction failed: {str(e)}")
             raise
     
+    def extract_iter(self, input_path: str,
+                     on_length: Optional[Callable[[int], None]] = None) -> Iterator[bytes]:
+        """
+        Extract data from an image, yielding it in chunks.
+        
+        Args:
+            input_path: Path to image containing hidden data
+            on_length: Optional callback, given the payload length in bytes
+                once it is read and before the first chunk is yielded
+            
+        Yields:
+            bytes: Chunks of extracted data, up to CHUNK_SIZE each
+            
+        Raises:
+            ValueError: If invalid image or corrupted data
+        """
+        try:
+            image, data_length = self._open_payload(input_path)
+            if on_length is not None:
+                on_length(data_length)
+            
+            # Convert one chunk of bits at a time after the length prefix
+            start = self.LENGTH_BYTES * 8
+            for offset in range(0, data_length, self.CHUNK_SIZE):
+                size = min(self.CHUNK_SIZE, data_length - offset)
+                yield self._extract_bytes(image, size, start + offset * 8)
+            logger.info(f"Successfully extracted {data_length} bytes of data")
+            
+        except Exception as e:
+            logger.error(f"Extraction failed: {str(e)}")
+            raise
+    
     def get_capacity(self, image_path: str) -> Tuple[int, str]:
         """
         Get capacity of image in bytes.
@@ -169,12 +276,11 @@ def get_capacity(self, image_path: str) -> Tuple[int, str]:
         Returns:
             Tuple[int, str]: (capacity in bytes, human readable size)
         """
+        # The size is in the PNG header, so no pixel data is decoded
         with Image.open(image_path) as img:
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            image = np.array(img)
+            width, height = img.size
         
-        capacity = self._get_capacity(image)
+        capacity = self._capacity_for(width * height * 3)
         
         # Make human readable
         suffixes = ['B', 'KB', 'MB', 'GB']
@@ -1,4 +1,12 @@
-from setuptools import setup, find_packages
+import platform
+import sys
+from setuptools import setup, find_packages, Extension
+
+# The LSB kernels use SSSE3 where the compiler accepts -mssse3; MSVC and
+# non-x86 builds get the portable scalar loop
+compile_args = []
+if sys.platform != 'win32' and platform.machine().lower() in ('x86_64', 'amd64', 'i386', 'i686'):
+    compile_args.append('-mssse3')
 
 setup(
     name="ez-steg",
@@ -10,6 +18,20 @@
         "cryptography",
         "numpy"
     ],
+    ext_modules=[
+        # Optional: installs fall back to the Python kernels if this fails to build
+        Extension(
+            'ez_steg._bitops',
+            sources=['ez_steg/_bitops.c'],
+            extra_compile_args=compile_args,
+            optional=True,
+        ),
+        Extension(
+            'ez_steg._emoji',
+            sources=['ez_steg/_emoji.c'],
+            optional=True,
+        ),
+    ],
     entry_points={
         'console_scripts': [
             'ez-steg=ez_steg.__main__:main',
@@ -18,4 +40,4 @@
     author="App13",
     description="Easy-to-use steganography tool with multiple modes",
     python_requires=">=3.7",
-) 
\ No newline at end of file
+)
@@ -2,6 +2,19 @@
 import sys
 from pathlib import Path
 
+import numpy as np
+import pytest
+from PIL import Image
+
 # Add the src directory to the Python path
 src_path = Path(__file__).parent.parent / "src"
-sys.path.insert(0, str(src_path)) 
\ No newline at end of file
+sys.path.insert(0, str(src_path))
+
+@pytest.fixture(scope="session")
+def carrier_png(tmp_path_factory):
+    """Encode one random 100x100 RGB carrier for the whole session."""
+    path = tmp_path_factory.mktemp("carrier") / "carrier.png"
+    image = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
+    # Tests only need lossless pixels, not small files
+    Image.fromarray(image).save(path, compress_level=1)
+    return path
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import pytest
+from pathlib import Path
+import os
+import sys
+
+# Add src directory to Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+import ez_steg_emoji
+from ez_steg_emoji import StegoEmoji
+
+@pytest.fixture
+def stego():
+    """Create a StegoEmoji instance for testing."""
+    return StegoEmoji()
+
+def test_embed_extract_cycle(stego):
+    """Test full embed and extract cycle over every byte value."""
+    test_data = bytes(range(256)) + os.urandom(1024)
+    encoded = stego.embed(test_data)
+    assert encoded[0] == stego.BASE_EMOJI
+    assert len(encoded) == len(test_data) + 5
+    assert stego.extract(encoded) == test_data
+
+def test_embed_mapped_file(stego, tmp_path):
+    """Test embedding straight from a memory-mapped file."""
+    import mmap
+    test_data = os.urandom(1024)
+    path = tmp_path / "payload.bin"
+    path.write_bytes(test_data)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        encoded = stego.embed(mapped)
+    assert stego.extract(encoded) == test_data
+
+def test_selector_ranges(stego):
+    """Test byte to variation selector mapping at the range boundaries."""
+    assert stego._byte_to_variation_selector(0) == "\uFE00"
+    assert stego._byte_to_variation_selector(15) == "\uFE0F"
+    assert stego._byte_to_variation_selector(16) == "\U000E0100"
+    assert stego._byte_to_variation_selector(255) == "\U000E01EF"
+
+def test_invalid_selector(stego):
+    """Test handling of characters that are not variation selectors."""
+    encoded = stego.embed(b"Test data")
+    with pytest.raises(ValueError):
+        stego.extract(encoded + "a")
+    with pytest.raises(ValueError):
+        stego.extract(encoded + "\U000E01F0")
+
+@pytest.mark.parametrize("data", [bytes(range(256)) * 4, bytes(range(16)), b""])
+def test_c_codecs_match_python(data):
+    """Test the optional C codecs against the table-based ones."""
+    codecs = pytest.importorskip("ez_steg._emoji")
+    selectors = codecs.encode_selectors(data)
+    assert selectors == ez_steg_emoji._encode_selectors(data)
+    assert codecs.decode_selectors(selectors) == data
+    with pytest.raises(ValueError):
+        codecs.decode_selectors(selectors + "a")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import pytest
 from pathlib import Path
-import tempfile
 import shutil
 import os
 from PIL import Image
@@ -19,24 +18,24 @@
 from ez_steg_lite import StegoLite
 
 @pytest.fixture
-def interactive():
+def interactive(tmp_path, monkeypatch):
     """Create a StegoInteractive instance for testing."""
+    # Its temp_stego directory is relative, so give each test its own
+    monkeypatch.chdir(tmp_path)
     return StegoInteractive()
 
 @pytest.fixture
-def temp_dir():
+def temp_dir(tmp_path):
     """Create a temporary directory for test files."""
-    temp_dir = tempfile.mkdtemp()
-    yield Path(temp_dir)
-    shutil.rmtree(temp_dir)
+    # The interactive fixture runs in tmp_path too, so a prompted path that
+    # lands in the wrong place still stays out of the working tree
+    return tmp_path
 
 @pytest.fixture
-def sample_image(temp_dir):
-    """Create a sample PNG image for testing."""
+def sample_image(temp_dir, carrier_png):
+    """Copy the session carrier image for testing."""
     image_path = temp_dir / "test_carrier.png"
-    # Create a small RGB image
-    image = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
-    Image.fromarray(image).save(image_path)
+    shutil.copy(carrier_png, image_path)
     return image_path
 
 @pytest.fixture
@@ -87,6 +86,15 @@ def test_init(interactive):
     assert isinstance(interactive.config["default_excludes"], set)
     assert interactive.temp_dir.exists()
 
+def test_sorted_excludes(interactive):
+    """Test the sorted exclusion view is cached until the defaults change."""
+    first = interactive.sorted_excludes
+    assert first == tuple(sorted(interactive.config["default_excludes"]))
+    assert interactive.sorted_excludes is first
+    
+    interactive.default_excludes = {"b", "a"}
+    assert interactive.sorted_excludes == ("a", "b")
+
 def test_switch_mode(interactive):
     """Test mode switching functionality."""
     # Mock user input to select lite mode
@@ -153,25 +161,97 @@ def test_create_carrier_image(interactive, temp_dir, sample_data_file):
         assert img.size[0] == img.size[1]  # Should be square
         assert img.size[0] % 8 == 0  # Should be multiple of 8
 
-def test_compress_folder(interactive, sample_data_folder):
-    """Test folder compression."""
+def test_archive_folder(interactive, sample_data_folder):
+    """Test folder archiving into a file object."""
+    import io
+    buffer = io.BytesIO()
     # Mock exclusion patterns to use defaults
     with patch("rich.prompt.Confirm.ask", return_value=False):
-        result = interactive.compress_folder(sample_data_folder)
+        assert interactive.archive_folder(sample_data_folder, buffer)
     
-    assert result is not None
-    assert result.exists()
-    assert result.suffix == ".gz"
+    # zstd frame when zstandard is installed, gzip otherwise
+    assert buffer.getvalue()[:4] == b"\x28\xb5\x2f\xfd" or buffer.getvalue()[:2] == b"\x1f\x8b"
+
+def test_should_exclude(interactive):
+    """Test compiled exclusion patterns against name and full-path matches."""
+    patterns = interactive.config["default_excludes"] | {"*cache*"}
+    assert interactive.should_exclude(Path("/src/module.pyc"), patterns)
+    assert interactive.should_exclude(Path(".git/config"), patterns)
+    assert interactive.should_exclude(Path("/src/.DS_Store"), patterns)
+    assert interactive.should_exclude(Path("/src/cache/data.txt"), patterns)
+    assert not interactive.should_exclude(Path("/src/main.py"), patterns)
+    assert not interactive.should_exclude(Path("/src/main.py"), set())
+
+def test_archive_folder_lite_mode(interactive, sample_data_folder):
+    """Test Lite mode archives folders without compression."""
+    import io
+    import tarfile
+    interactive.mode = "lite"
+    buffer = io.BytesIO()
+    with patch("rich.prompt.Confirm.ask", return_value=False):
+        assert interactive.archive_folder(sample_data_folder, buffer)
     
-    # Clean up
-    result.unlink()
+    buffer.seek(0)
+    with tarfile.open(fileobj=buffer, mode='r:') as tar:
+        assert sorted(Path(name).as_posix() for name in tar.getnames()) == [
+            "file1.txt", "file2.txt", "subdir/file3.txt"
+        ]
+
+def test_estimate_folder_size(interactive, sample_data_folder):
+    """Test the folder size estimate matches an uncompressed archive."""
+    import io
+    (sample_data_folder / "large.bin").write_bytes(os.urandom(5000))
+    (sample_data_folder / "module.pyc").write_bytes(b"\0" * 5000)
+    
+    interactive.mode = "lite"
+    buffer = io.BytesIO()
+    with patch("rich.prompt.Confirm.ask", return_value=False):
+        assert interactive.archive_folder(sample_data_folder, buffer)
+    estimate = interactive._estimate_folder_size(
+        sample_data_folder, interactive.config["default_excludes"]
+    )
+    assert estimate == len(buffer.getvalue())
+
+def test_scan_tree(interactive, sample_data_folder):
+    """Test single-pass folder scan with exclusion and pruning."""
+    git_dir = sample_data_folder / ".git"
+    git_dir.mkdir()
+    (git_dir / "config").write_text("[core]")
+    (sample_data_folder / "module.pyc").write_bytes(b"\0")
+    
+    included, excluded = interactive._scan_tree(
+        sample_data_folder, interactive.config["default_excludes"]
+    )
+    arcnames = sorted(Path(arcname).as_posix() for _, arcname in included)
+    assert arcnames == ["file1.txt", "file2.txt", "subdir/file3.txt"]
+    assert excluded == 2  # the pruned .git folder and the .pyc file
+    
+    # Bare directory names are pruned as well
+    build_dir = sample_data_folder / "subdir" / "build"
+    build_dir.mkdir()
+    (build_dir / "out.txt").write_text("built")
+    included, excluded = interactive._scan_tree(sample_data_folder, {"build"})
+    arcnames = sorted(Path(arcname).as_posix() for _, arcname in included)
+    assert "subdir/build/out.txt" not in arcnames
+    assert excluded == 1
+    
+    # File globs do not prune directories whose names happen to match
+    log_dir = sample_data_folder / "build.log"
+    log_dir.mkdir()
+    (log_dir / "notes.txt").write_text("kept")
+    (log_dir / "run.log").write_text("dropped")
+    included, excluded = interactive._scan_tree(sample_data_folder, {"*.log"})
+    arcnames = sorted(Path(arcname).as_posix() for _, arcname in included)
+    assert "build.log/notes.txt" in arcnames
+    assert "build.log/run.log" not in arcnames
+    assert excluded == 1
 
 def test_validate_and_convert_image(interactive, temp_dir):
     """Test image validation and conversion."""
     # Create a grayscale image
     gray_image = Image.new('L', (100, 100), 128)
     gray_path = temp_dir / "gray.png"
-    gray_image.save(gray_path)
+    gray_image.save(gray_path, compress_level=1)
     
     # Test conversion
     result = interactive.validate_and_convert_image(gray_path)
@@ -181,6 +261,15 @@ def test_validate_and_convert_image(interactive, temp_dir):
     # Verify converted image is RGB
     with Image.open(result) as img:
         assert img.mode == "RGB"
+    
+    # RGBA keeps its color channels exactly
+    rgba = np.random.randint(0, 256, (50, 60, 4), dtype=np.uint8)
+    rgba_path = temp_dir / "rgba.png"
+    Image.fromarray(rgba, 'RGBA').save(rgba_path, compress_level=1)
+    result = interactive.validate_and_convert_image(rgba_path)
+    with Image.open(result) as img:
+        assert img.mode == "RGB"
+        assert np.array_equal(np.asarray(img), rgba[:, :, :3])
 
 def test_check_image_capacity(interactive, sample_image):
     """Test image capacity checking."""
@@ -228,6 +317,28 @@ def test_embed_file_production_mode(interactive, temp_dir, sample_image, sample_
         original_data = f.read()
     assert extracted_data == original_data
 
+def test_embed_file_unwritable_output(interactive, temp_dir, sample_image, sample_data_file):
+    """Test a failed save reports its own error, not one from unmapping the input."""
+    # A directory where the output image should go makes the save fail
+    output_path = sample_image.parent / f"{sample_image.stem}_embedded{sample_image.suffix}"
+    output_path.mkdir()
+    mock_inputs = [
+        str(sample_image),  # Carrier image path
+        str(sample_data_file),  # Data file path
+        "test_password_12345"  # Password
+    ]
+    
+    with patch("rich.prompt.Prompt.ask", side_effect=mock_inputs):
+        with patch("rich.prompt.Confirm.ask", return_value=True):
+            with patch.object(interactive.console, "print") as printed:
+                interactive.embed_data()
+    
+    messages = [str(call.args[0]) for call in printed.call_args_list if call.args]
+    errors = [m for m in messages if m.startswith("[red]Error embedding data")]
+    assert len(errors) == 1
+    assert output_path.name in errors[0]
+    assert "BufferError" not in errors[0] and "exported pointers" not in errors[0]
+
 def test_embed_folder_production_mode(interactive, temp_dir, sample_image, sample_data_folder):
     """Test embedding a folder in production mode."""
     # Mock user inputs for both the folder selection and exclusion patterns
@@ -254,13 +365,18 @@ def test_embed_folder_production_mode(interactive, temp_dir, sample_image, sampl
     extract_dir = temp_dir / "extracted"
     extract_dir.mkdir()
     
+    # Folders are zstd-compressed when zstandard is installed, else gzipped
+    if extracted_data[:4] == b"\x28\xb5\x2f\xfd":
+        import zstandard
+        extracted_data = zstandard.ZstdDecompressor().decompressobj().decompress(extracted_data)
+    
     # Save and extract the archive
-    archive_path = extract_dir / "extracted.tar.gz"
+    archive_path = extract_dir / "extracted.tar"
     with open(archive_path, 'wb') as f:
         f.write(extracted_data)
     
     import tarfile
-    with tarfile.open(archive_path, 'r:gz') as tar:
+    with tarfile.open(archive_path, 'r:*') as tar:
         tar.extractall(extract_dir)
     
     # Verify extracted files
@@ -301,26 +417,35 @@ def test_extract_production_mode(interactive, temp_dir, embedded_image):
     output_path = temp_dir / "extracted_data.txt"
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Mock user inputs with validation retries
+    # Mock user inputs, in prompt order
     mock_inputs = [
         str(embedded_image),  # Embedded image path
         "test_password_12345",  # Password
-        str(output_path),  # First attempt
-        str(output_path),  # Second attempt (after validation)
-        "y"  # Confirm extraction
+        str(output_path),  # Output path
     ]
     
-    with patch("rich.prompt.Prompt.ask", side_effect=mock_inputs):
+    from rich.progress import Progress
+    with patch("rich.prompt.Prompt.ask", side_effect=mock_inputs) as ask, \
+         patch.object(Progress, "update", autospec=True, side_effect=Progress.update) as update:
         with patch("rich.prompt.Confirm.ask", return_value=True):
             # Temporarily patch validate_path to allow non-existent files
             with patch.object(interactive, 'validate_path', 
                             side_effect=lambda p, must_exist=True: Path(p)):
                 interactive.extract_data()
     
+    # Every answer went to the prompt it was meant for, so none was taken
+    # as a file name
+    assert ask.call_count == len(mock_inputs)
+    assert not (temp_dir / "test_password_12345").exists()
+    
     # Verify extraction
     assert output_path.exists()
     assert output_path.stat().st_size > 0
     assert output_path.read_text() == "Test data for steganography"
+    
+    # The bar's total comes from the payload length in the header
+    totals = [call.kwargs["total"] for call in update.call_args_list if "total" in call.kwargs]
+    assert totals == [len("Test data for steganography")]
 
 def test_extract_wrong_password(interactive, temp_dir, embedded_image):
     """Test extraction with wrong password."""
@@ -328,25 +453,47 @@ def test_extract_wrong_password(interactive, temp_dir, embedded_image):
     output_path = temp_dir / "extracted_data.txt"
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Mock user inputs with validation retries
+    # Mock user inputs, in prompt order
     mock_inputs = [
         str(embedded_image),  # Embedded image path
         "wrong_password_12345",  # Wrong password
-        str(output_path),  # First attempt
-        str(output_path),  # Second attempt (after validation)
-        "y"  # Confirm extraction
+        str(output_path),  # Output path
     ]
     
-    with patch("rich.prompt.Prompt.ask", side_effect=mock_inputs):
+    with patch("rich.prompt.Prompt.ask", side_effect=mock_inputs) as ask:
         with patch("rich.prompt.Confirm.ask", return_value=True):
             # Temporarily patch validate_path to allow non-existent files
             with patch.object(interactive, 'validate_path', 
                             side_effect=lambda p, must_exist=True: Path(p)):
                 interactive.extract_data()
     
+    # Every answer went to the prompt it was meant for, so none was taken
+    # as a file name
+    assert ask.call_count == len(mock_inputs)
+    assert not (temp_dir / "wrong_password_12345").exists()
+    
     # Verify file was not created due to decryption error
     assert not output_path.exists()
 
+def test_extract_wrong_password_keeps_existing_output(interactive, temp_dir, embedded_image):
+    """Test a failed extraction leaves a confirmed-overwrite target intact."""
+    output_path = temp_dir / "extracted_data.txt"
+    output_path.write_text("original contents")
+    mock_inputs = [
+        str(embedded_image),  # Embedded image path
+        "wrong_password_12345",  # Wrong password
+        str(output_path),  # Existing output path, overwrite confirmed
+    ]
+    
+    with patch("rich.prompt.Prompt.ask", side_effect=mock_inputs) as ask:
+        with patch("rich.prompt.Confirm.ask", return_value=True):
+            interactive.extract_data()
+    
+    assert ask.call_count == len(mock_inputs)
+    assert output_path.read_text() == "original contents"
+    # The temporary output is removed as well
+    assert not list(temp_dir.glob(".extracted_data.txt.*.part"))
+
 def test_embed_large_file(interactive, temp_dir, sample_image):
     """Test embedding a large file (should fail gracefully)."""
     # Create a large file that exceeds image capacity
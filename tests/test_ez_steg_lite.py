@@ -2,6 +2,7 @@
 import pytest
 from pathlib import Path
 import tempfile
+import shutil
 import os
 from PIL import Image
 import numpy as np
@@ -19,22 +20,11 @@ def stego():
     return StegoLite()
 
 @pytest.fixture
-def temp_image():
-    """Create a temporary test image."""
-    temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    try:
-        # Create a small RGB image
-        image = np.random.randint(0, 256, (100, 100, 3), dtype=np.uint8)
-        img = Image.fromarray(image)
-        img.save(temp_file.name)
-        img.close()
-        temp_file.close()
-        yield Path(temp_file.name)
-    finally:
-        try:
-            os.unlink(temp_file.name)
-        except PermissionError:
-            pass  # File might still be in use
+def temp_image(carrier_png, tmp_path):
+    """Copy the session carrier into a directory of this test's own."""
+    # Tests write their output next to the image, so each gets a fresh
+    # directory and parallel workers never share files
+    return Path(shutil.copy(carrier_png, tmp_path / "carrier.png"))
 
 def test_initialization():
     """Test StegoLite initialization."""
@@ -43,7 +33,8 @@ def test_initialization():
 
 def test_capacity_calculation(stego, temp_image):
     """Test image capacity calculation."""
-    capacity = stego._get_capacity(np.array(Image.open(temp_image)))
+    with Image.open(temp_image) as img:
+        capacity = stego._get_capacity(np.asarray(img))
     assert capacity > 0
 
 def test_embed_extract_cycle(stego, temp_image):
@@ -59,6 +50,54 @@ def test_embed_extract_cycle(stego, temp_image):
         # Extract data
         extracted_data = stego.extract(str(output_path))
         assert extracted_data == test_data
+        
+        # Any zlib level is lossless
+        stego.embed(test_data, str(temp_image), str(output_path), compress_level=9)
+        assert stego.extract(str(output_path)) == test_data
+    finally:
+        # Clean up
+        if output_path.exists():
+            try:
+                output_path.unlink()
+            except PermissionError:
+                pass  # File might still be in use
+
+def test_extract_iter_cycle(stego, temp_image):
+    """Test extracting in chunks and the bounded scratch buffer."""
+    test_data = os.urandom(1000)
+    output_path = temp_image.parent / "output.png"
+    stego.CHUNK_SIZE = 256  # Force several chunks
+    
+    try:
+        stego.embed(test_data, str(temp_image), str(output_path))
+        lengths = []
+        chunks = list(stego.extract_iter(str(output_path), lengths.append))
+        assert lengths == [len(test_data)]
+        assert len(chunks) == 4
+        assert b"".join(chunks) == test_data
+        
+        # A whole-payload read does not grow the reused buffer past a chunk
+        assert stego.extract(str(output_path)) == test_data
+        assert stego._scratch.size == stego.CHUNK_SIZE
+    finally:
+        # Clean up
+        if output_path.exists():
+            try:
+                output_path.unlink()
+            except PermissionError:
+                pass  # File might still be in use
+
+def test_embed_progress(stego, temp_image):
+    """Test progress callbacks cover the whole payload."""
+    test_data = os.urandom(1000)
+    output_path = temp_image.parent / "output.png"
+    stego.CHUNK_SIZE = 256  # Force several chunks
+    
+    try:
+        reported = []
+        stego.embed(test_data, str(temp_image), str(output_path), reported.append)
+        assert reported == [256, 256, 256, 232]
+        assert stego.extract(str(output_path)) == test_data
     finally:
         # Clean up
         if output_path.exists():
@@ -119,5 +158,15 @@ def test_invalid_image_format(stego):
         except PermissionError:
             pass  # File might still be in use
 
+def test_import_skips_crypto_stack():
+    """Test importing Lite leaves the production engine's dependencies unloaded."""
+    import subprocess
+    probe = ("import sys, ez_steg.ez_steg_lite; "
+             "print(sorted(m for m in ('cryptography', 'argon2', 'ez_steg.ez_steg_core') "
+             "if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                            cwd=Path(__file__).parent.parent, check=True)
+    assert result.stdout.strip() == "[]"
+
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file